@@ -3,11 +3,31 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
+import httpx
+import time
+from .cache import AsyncTTLCache, digest
 from .config import get_settings
+from .http import get_http_client
 
 settings = get_settings()
 security = HTTPBearer()
 
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+# Verified tokens by digest. The frontend reuses one token for its whole
+# lifetime, so only the first request pays for signature verification.
+token_cache = AsyncTTLCache(
+    "auth.tokens",
+    ttl=settings.auth_token_cache_ttl,
+    maxsize=settings.auth_token_cache_max_entries,
+)
+
+# Signing keys from supabase_jwks_url, fetched once
+jwks_cache = AsyncTTLCache("auth.jwks", ttl=settings.jwks_cache_ttl, maxsize=1)
+
+# Last refetch triggered by an unknown kid (monotonic), so bogus kids can't force a fetch per request
+_jwks_refetched_at = 0.0
+
 
 class TokenData(BaseModel):
     """JWT token payload data."""
@@ -25,12 +45,79 @@ class UserWithProfile(BaseModel):
     role: str = "user"
 
 
+async def _fetch_jwks() -> Dict[str, Dict[str, Any]]:
+    try:
+        response = await get_http_client("supabase").get(settings.supabase_jwks_url)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        raise JWTError(f"Could not fetch signing keys: {e}")
+    return {key.get("kid"): key for key in response.json().get("keys", [])}
+
+
+async def _get_signing_key(kid: Optional[str]) -> Dict[str, Any]:
+    """
+    JWKS key for kid. An unknown kid may mean the keys were rotated, so the
+    set is refetched, at most once per jwks_refetch_interval.
+    """
+    global _jwks_refetched_at
+    keys = await jwks_cache.get_or_load("keys", _fetch_jwks)
+    now = time.monotonic()
+    if kid not in keys and now - _jwks_refetched_at >= settings.jwks_refetch_interval:
+        _jwks_refetched_at = now
+        jwks_cache.invalidate("keys")
+        keys = await jwks_cache.get_or_load("keys", _fetch_jwks)
+    if kid not in keys:
+        raise JWTError(f"Unknown signing key: {kid}")
+    return keys[kid]
+
+
+async def _decode_token(token: str) -> Dict[str, Any]:
+    """Verify and decode a Supabase JWT."""
+    header = jwt.get_unverified_header(token)
+    
+    if settings.supabase_jwks_url and header.get("alg") in ASYMMETRIC_ALGORITHMS:
+        key = await _get_signing_key(header.get("kid"))
+        return jwt.decode(
+            token,
+            key,
+            algorithms=ASYMMETRIC_ALGORITHMS,
+            options={"verify_aud": False}  # Supabase uses various audiences
+        )
+    
+    # Decode JWT - for dev, decode without signature verification
+    # In production, set SUPABASE_JWT_SECRET for proper verification
+    if settings.supabase_jwt_secret:
+        return jwt.decode(
+            token,
+            settings.supabase_jwt_secret,
+            algorithms=["HS256"],
+            options={"verify_aud": False}  # Supabase uses various audiences
+        )
+    
+    # Verification is configured (JWKS only): anything it can't verify is rejected
+    if settings.supabase_jwks_url:
+        raise JWTError(f"Unsupported signing algorithm: {header.get('alg')}")
+    
+    # Development mode: decode without signature verification
+    return jwt.decode(
+        token,
+        "",  # Key required but not used when verify_signature is False
+        algorithms=["HS256"],
+        options={
+            "verify_signature": False,
+            "verify_aud": False,
+            "verify_exp": False  # Also skip expiration for dev
+        },
+    )
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> TokenData:
     """
     Validate JWT token from Supabase Auth.
     Returns basic token data (user_id, email).
+    Verified tokens are cached until they expire.
     """
     token = credentials.credentials
     
@@ -38,28 +125,13 @@ async def get_current_user(
     if token == "mock_token_for_demo":
         return TokenData(user_id="00000000-0000-0000-0000-000000000000", email="mock@example.com")
     
+    key = digest(token)
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        return token_data
+    
     try:
-        # Decode JWT - for dev, decode without signature verification
-        # In production, set SUPABASE_JWT_SECRET for proper verification
-        if settings.supabase_jwt_secret:
-            payload = jwt.decode(
-                token,
-                settings.supabase_jwt_secret,
-                algorithms=["HS256"],
-                options={"verify_aud": False}  # Supabase uses various audiences
-            )
-        else:
-            # Development mode: decode without signature verification
-            payload = jwt.decode(
-                token,
-                "",  # Key required but not used when verify_signature is False
-                algorithms=["HS256"],
-                options={
-                    "verify_signature": False,
-                    "verify_aud": False,
-                    "verify_exp": False  # Also skip expiration for dev
-                },
-            )
+        payload = await _decode_token(token)
         
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
@@ -71,7 +143,16 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return TokenData(user_id=user_id, email=email)
+        token_data = TokenData(user_id=user_id, email=email)
+        
+        # Never serve a token from cache past its exp
+        ttl = settings.auth_token_cache_ttl
+        if payload.get("exp"):
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            token_cache.set(key, token_data, ttl)
+        
+        return token_data
         
     except JWTError as e:
         print(f"JWT Error: {e}")  # Debug logging
@@ -0,0 +1,192 @@
+"""
+In-process async caching for upstream API responses.
+
+AsyncTTLCache is a size-bounded LRU with per-entry TTLs and optional
+stale-while-revalidate: an expired entry that is still inside its stale
+window is served immediately while a background task refreshes it.
+Concurrent loads of the same key share one upstream call (single-flight).
+`cached` wraps an async function or method with a cache.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Union
+
+from app.core.deadline import clear_deadline
+from app.core.singleflight import SingleFlight
+
+
+# All named caches, for diagnostics
+_caches: Dict[str, "AsyncTTLCache"] = {}
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class AsyncTTLCache:
+    """Size-bounded LRU cache with TTLs and stale-while-revalidate."""
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 256, stale_ttl: float = 0.0):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._flight = SingleFlight(name)
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        _caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value without loading."""
+        entry = self._data.get(key)
+        if entry is None or time.monotonic() >= entry.expires_at:
+            return default
+        self._data.move_to_end(key)
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries when full."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        self._data[key] = _Entry(value, now + ttl, now + ttl + self.stale_ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._data.clear()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Union[None, float, Callable[[Any], float]] = None,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, loading it on a miss.
+        Stale entries are served as-is and refreshed in the background.
+        Values rejected by cache_if are returned but not stored.
+        ttl may be a function of the loaded value (e.g. shorter for failures).
+        Concurrent misses for the same key await a single load.
+        """
+        now = time.monotonic()
+        entry = self._data.get(key)
+        if entry is not None:
+            if now < entry.expires_at:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return entry.value
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                self._data.move_to_end(key)
+                self._refresh_in_background(key, loader, ttl, cache_if)
+                return entry.value
+            del self._data[key]
+
+        self.misses += 1
+        return await self._flight.do(key, self._loading(key, loader, ttl, cache_if))
+
+    def _loading(self, key, loader, ttl, cache_if) -> Callable[[], Awaitable[Any]]:
+        async def load():
+            value = await loader()
+            if cache_if is None or cache_if(value):
+                self.set(key, value, ttl(value) if callable(ttl) else ttl)
+            return value
+
+        return load
+
+    def _refresh_in_background(self, key, loader, ttl, cache_if) -> None:
+        if self._flight.in_flight(key):
+            return
+
+        async def refresh():
+            # Not bound by the deadline of the request that found the entry stale
+            clear_deadline()
+            try:
+                await self._flight.do(key, self._loading(key, loader, ttl, cache_if))
+            except Exception as e:
+                print(f"[Cache] Background refresh failed for {self.name}: {e}")
+
+        asyncio.create_task(refresh())
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self._flight.coalesced,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+def cached(
+    cache: AsyncTTLCache,
+    key: Callable[..., Optional[Hashable]],
+    cache_if: Optional[Callable[[Any], bool]] = None,
+    ttl: Union[None, float, Callable[[Any], float]] = None,
+):
+    """
+    Cache an async function's results.
+
+    `key` receives the same arguments as the wrapped function and returns
+    the cache key. Returning None bypasses the cache for that call.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            if cache_key is None:
+                return await fn(*args, **kwargs)
+            return await cache.get_or_load(cache_key, lambda: fn(*args, **kwargs), ttl=ttl, cache_if=cache_if)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def is_not_none(value: Any) -> bool:
+    """cache_if predicate that skips caching missing results."""
+    return value is not None
+
+
+def digest(value: str) -> str:
+    """Short, stable digest for secrets used in cache keys (tokens, API keys)."""
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+def token_digest(tokens: Optional[dict]) -> Optional[str]:
+    """Cache key for an OAuth token dict (None when not connected)."""
+    if not tokens or not tokens.get("access_token"):
+        return None
+    return digest(tokens["access_token"])
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every named cache."""
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,138 @@
+"""
+Circuit breakers for flaky or rate-limited upstreams.
+
+After `failure_threshold` consecutive failed calls a breaker opens and
+callers skip straight to their fallback instead of waiting on an upstream
+that is known to be failing. Once `reset_timeout` has passed it goes
+half-open and lets a single probe call through: success closes it again,
+failure re-opens it for another cool-down.
+
+Only upstream failures count: a spent request deadline or a local rate
+limit rejection says nothing about the upstream's health, so
+`record_failure(exc)` ignores those (and frees a half-open probe slot).
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from .config import get_settings
+from .deadline import DeadlineExceeded, remaining
+from .rate_limit import RateLimitExceeded
+
+settings = get_settings()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited by an open breaker."""
+
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__(f"circuit '{name}' is open")
+
+
+def is_upstream_failure(exc: Optional[BaseException]) -> bool:
+    """
+    False for errors raised locally (deadline, cancellation, client-side rate
+    limit), including httpx timeouts that were shrunk to a now-spent budget.
+    """
+    if isinstance(exc, (DeadlineExceeded, asyncio.CancelledError, RateLimitExceeded)):
+        return False
+    left = remaining()
+    return left is None or left > 0
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker counting consecutive failures."""
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.circuit_failure_threshold
+        self.reset_timeout = reset_timeout or settings.circuit_reset_timeout
+        self._state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probe_started = None
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go upstream now.
+        In half-open state only one probe is let through at a time; a probe
+        that never reports back frees its slot after reset_timeout.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            now = time.monotonic()
+            if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                self._probe_started = now
+                return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def release(self) -> None:
+        """A call let through ended without a verdict on the upstream; free the probe slot."""
+        self._probe_started = None
+
+    def record_failure(self, exc: Optional[BaseException] = None) -> None:
+        if exc is not None and not is_upstream_failure(exc):
+            self.release()
+            return
+        self.failures += 1
+        if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != OPEN:
+                print(f"⚠️ Circuit '{self.name}' opened after {self.failures} failure(s)")
+            self._state = OPEN
+            self.opened_at = time.monotonic()
+            self._probe_started = None
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "retry_in": round(max(0.0, self.opened_at + self.reset_timeout - time.monotonic()), 1)
+            if state == OPEN else 0.0,
+        }
+
+
+# One breaker per upstream
+breakers: Dict[str, CircuitBreaker] = {
+    name: CircuitBreaker(name)
+    for name in ("gemini_primary", "gemini_secondary", "huggingface", "elevenlabs", "graph_api")
+}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get the breaker for an upstream."""
+    return breakers[name]
+
+
+def gemini_breaker(api_key: Optional[str]) -> CircuitBreaker:
+    """Breaker for whichever Gemini key a call is made with."""
+    if api_key and api_key == settings.gemini_api_key_secondary and api_key != settings.gemini_api_key:
+        return breakers["gemini_secondary"]
+    return breakers["gemini_primary"]
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """State of every breaker."""
+    return {name: breaker.stats() for name, breaker in breakers.items()}
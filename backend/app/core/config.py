@@ -11,6 +11,9 @@ class Settings(BaseSettings):
     supabase_key: str
     supabase_service_key: Optional[str] = None  # Made optional
     supabase_jwt_secret: Optional[str] = None  # For JWT verification
+    supabase_jwks_url: Optional[str] = None  # Asymmetric signing keys, e.g. <project>/auth/v1/.well-known/jwks.json
+    db_max_workers: int = 8  # Threads running blocking Supabase queries
+    db_page_size: int = 1000  # Rows per .range() page; keep <= PostgREST max-rows
     
     # AI - support both OpenAI and Gemini
     openai_api_key: Optional[str] = ""
@@ -37,7 +40,80 @@ class Settings(BaseSettings):
     
     # Hugging Face (for Qwen)
     huggingface_api_key: Optional[str] = ""
+
+    # Outbound HTTP (shared pooled clients, one pool per upstream)
+    http_timeout: float = 10.0  # Read/write/pool timeout in seconds
+    http_connect_timeout: float = 5.0
+    http_max_connections: int = 20  # Per upstream host
+    http_max_keepalive_connections: int = 10  # Per upstream host
+    http_keepalive_expiry: float = 30.0
+    http2_enabled: bool = False  # Requires the optional `h2` package
+    
+    # /api/real/all per-platform time budgets (seconds)
+    real_all_youtube_timeout: float = 8.0
+    real_all_instagram_timeout: float = 8.0
+    real_all_twitter_timeout: float = 6.0
+    real_all_linkedin_timeout: float = 6.0
+    
+    # YouTube Data API
+    youtube_fetch_concurrency: int = 4  # Max in-flight calls when refreshing featured channels
+    youtube_stream_max_videos: int = 500  # Cap on videos per NDJSON history stream (deadline-exempt)
+    
+    # Instagram sync
+    instagram_sync_max_posts: int = 500  # Media walked per sync (25 per page)
+    instagram_batch_concurrency: int = 3  # Max in-flight Graph batch requests
+    
+    # Twitter sync
+    twitter_sync_max_tweets: int = 1000  # Stored tweets refreshed per sync (100 per lookup call)
     
+    # posts/metrics ingestion
+    ingest_batch_size: int = 500  # Posts per ingest_posts round-trip
+    analytics_use_rollups: bool = True  # AnalyticsEngine reads daily/posting-hour rollups instead of raw metrics
+    channel_index_path: str = "channel_index.json"  # Persistent handle -> channel ID index
+    channel_index_ttl: float = 30 * 24 * 3600.0
+    channel_index_negative_ttl: float = 3600.0  # Unresolvable handles/search terms
+    
+    # In-process response caches (seconds)
+    cache_max_entries: int = 512  # Per cache, LRU-evicted beyond this
+    youtube_cache_ttl: float = 300.0
+    platform_analytics_cache_ttl: float = 120.0
+    platform_identity_cache_ttl: float = 3600.0  # Account IDs/profiles resolved from an OAuth token
+    cache_stale_ttl: float = 600.0  # Serve expired entries this long while refreshing in the background
+    scraper_cache_ttl: float = 900.0  # Public Instagram profile scrapes
+    scraper_negative_ttl: float = 300.0  # Handles that failed or were blocked
+    scraper_max_bytes: int = 512 * 1024  # Stop reading a profile page past this
+    etag_cache_ttl: float = 24 * 3600.0  # How long an ETag'd body is kept for revalidation
+    etag_cache_max_entries: int = 1024
+    profile_cache_ttl: float = 60.0  # User profiles read by auth dependencies; writes go through
+    auth_token_cache_ttl: float = 3600.0  # Verified JWTs, never past their exp
+    auth_token_cache_max_entries: int = 1024
+    jwks_cache_ttl: float = 3600.0
+    jwks_refetch_interval: float = 60.0  # Min seconds between refetches for an unknown kid
+    
+    # Upstream rate limits (client-side, per API key / access token)
+    rate_limit_mode: str = "queue"  # "queue" waits for a slot, "reject" fails fast
+    rate_limit_max_wait: float = 30.0  # Longest a queued call may wait before being rejected
+    youtube_requests_per_minute: float = 300.0
+    youtube_daily_quota: int = 10000  # Quota units (search.list = 100, most reads = 1)
+    youtube_quota_timezone: str = "America/Los_Angeles"  # YouTube quotas reset at midnight Pacific
+    instagram_requests_per_minute: float = 60.0
+    instagram_daily_quota: int = 4800
+    gemini_requests_per_minute: float = 15.0
+    gemini_daily_quota: int = 1500
+    huggingface_requests_per_minute: float = 30.0
+    huggingface_daily_quota: int = 1000
+    elevenlabs_requests_per_minute: float = 10.0
+    elevenlabs_daily_quota: int = 0  # 0 = unlimited
+    
+    # Circuit breakers (Gemini, Hugging Face, ElevenLabs, Graph API)
+    circuit_failure_threshold: int = 3  # Consecutive failed calls before opening
+    circuit_reset_timeout: float = 30.0  # Seconds open before a half-open probe
+    
+    # Request deadlines (overridable per request with the X-Request-Timeout header)
+    request_timeout: float = 30.0  # Default budget in seconds (0 = none)
+    request_timeout_max: float = 120.0  # Cap on header-requested budgets
+    request_timeout_exempt_paths: str = "/api/hooks,/api/voice-coach,/api/post/generate,/uploads,/api/youtube/stream,/api/real/youtube/stream"  # Long-running uploads/processing/streams
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
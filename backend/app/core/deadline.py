@@ -0,0 +1,158 @@
+"""
+Request-scoped deadlines.
+
+DeadlineMiddleware gives every HTTP request a time budget, taken from the
+X-Request-Timeout header (seconds) or settings.request_timeout. The
+absolute deadline lives in a ContextVar, so everything awaited on behalf
+of the request can size its own timeout from what is left:
+
+- httpx clients shrink each request's timeouts via an event hook
+- `with_deadline` bounds any awaitable (Gemini, OpenAI, Supabase queries
+  via `app.core.supabase.execute`, ...)
+
+When the budget runs out the request is cancelled and answered with a 504.
+Handlers with a catch-all `except Exception` re-raise DeadlineExceeded
+first, so it reaches the middleware instead of becoming a 500.
+"""
+import asyncio
+import json
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Optional
+
+import httpx
+
+from .config import get_settings
+
+settings = get_settings()
+
+DEADLINE_HEADER = "x-request-timeout"
+
+# Absolute deadline (time.monotonic()) for the current request, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The current request's time budget is spent."""
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget (None = no deadline)."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def set_deadline(seconds: Optional[float]):
+    """Start a budget of `seconds` for the current context (None clears it)."""
+    return _deadline.set(None if seconds is None else time.monotonic() + seconds)
+
+
+def clear_deadline() -> None:
+    """Detach the current context (e.g. a background task) from any request deadline."""
+    _deadline.set(None)
+
+
+def timeout_for(default: Optional[float] = None) -> Optional[float]:
+    """
+    Timeout for a downstream call: `default`, capped by the remaining budget.
+    Raises DeadlineExceeded if nothing is left.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    return left if default is None else min(default, left)
+
+
+async def with_deadline(awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Await with the request deadline (and optional own timeout) applied."""
+    try:
+        budget = timeout_for(timeout)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+    if budget is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, budget)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("request deadline exceeded")
+
+
+async def apply_deadline_to_request(request: httpx.Request) -> None:
+    """httpx request hook: shrink connect/read/write/pool timeouts to the budget left."""
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    timeouts = request.extensions.get("timeout", {})
+    request.extensions["timeout"] = {
+        kind: left if value is None else min(value, left)
+        for kind, value in (timeouts or dict.fromkeys(("connect", "read", "write", "pool"))).items()
+    }
+
+
+def _budget_from_header(value: Optional[bytes]) -> float:
+    if value:
+        try:
+            requested = float(value.decode())
+            if requested > 0:
+                return min(requested, settings.request_timeout_max)
+        except ValueError:
+            pass
+    return settings.request_timeout
+
+
+class DeadlineMiddleware:
+    """ASGI middleware that bounds each HTTP request by its time budget."""
+
+    def __init__(self, app):
+        self.app = app
+        self.exempt = tuple(
+            prefix.strip() for prefix in settings.request_timeout_exempt_paths.split(",") if prefix.strip()
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        budget = _budget_from_header(headers.get(DEADLINE_HEADER.encode()))
+        if budget <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        token = set_deadline(budget)
+        try:
+            await asyncio.wait_for(self.app(scope, receive, send_wrapper), budget)
+        except asyncio.TimeoutError:
+            # Covers both our own wait_for and DeadlineExceeded raised downstream
+            print(f"⏱️ Request deadline ({budget:.1f}s) exceeded: {scope['method']} {scope['path']}")
+            if response_started:
+                return
+            body = json.dumps({"detail": "Request deadline exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+        finally:
+            _deadline.reset(token)
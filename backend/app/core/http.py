@@ -0,0 +1,167 @@
+"""
+Shared outbound HTTP clients.
+
+Every upstream (YouTube, Graph API, Twitter, ...) gets its own pooled
+httpx.AsyncClient so connection limits apply per host and keep-alive
+connections are reused across requests instead of paying DNS + TLS on
+every call. Clients are opened in the app lifespan and closed on shutdown.
+
+`conditional_get` adds ETag revalidation on top: the parsed body of each
+GET is kept with its ETag, and a 304 is answered from that copy.
+"""
+import importlib.util
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .cache import AsyncTTLCache, digest
+from .config import get_settings
+from .deadline import apply_deadline_to_request
+
+settings = get_settings()
+
+
+# Upstreams created eagerly at startup (others are created on first use)
+UPSTREAMS = [
+    "youtube",
+    "instagram",
+    "twitter",
+    "linkedin",
+    "huggingface",
+    "elevenlabs",
+    "oauth",
+    "scraper",
+]
+
+
+class HTTPClientRegistry:
+    """Process-wide registry of pooled httpx clients keyed by upstream name."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._http2 = settings.http2_enabled and importlib.util.find_spec("h2") is not None
+        if settings.http2_enabled and not self._http2:
+            print("⚠️ HTTP/2 requested but `h2` is not installed. Falling back to HTTP/1.1.")
+
+    def _build(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=self._http2,
+            timeout=httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            # Never wait on an upstream past the current request's deadline
+            event_hooks={"request": [apply_deadline_to_request]},
+        )
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """
+        Get the pooled client for an upstream.
+        Created lazily so scripts running outside the app lifespan still work.
+        """
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build()
+            self._clients[name] = client
+        return client
+
+    async def startup(self) -> None:
+        """Open clients for all known upstreams."""
+        for name in UPSTREAMS:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        """Close all clients and release pooled connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Open clients and pool limits (for diagnostics)."""
+        return {
+            name: {
+                "max_connections": settings.http_max_connections,
+                "max_keepalive_connections": settings.http_max_keepalive_connections,
+                "http2": self._http2,
+            }
+            for name, client in self._clients.items()
+            if not client.is_closed
+        }
+
+
+# Singleton instance
+http_clients = HTTPClientRegistry()
+
+
+def get_http_client(name: str = "default") -> httpx.AsyncClient:
+    """Get the shared pooled client for an upstream."""
+    return http_clients.get(name)
+
+
+# Parsed bodies keyed by request, stored with their ETag
+etag_cache = AsyncTTLCache(
+    "http.etags",
+    ttl=settings.etag_cache_ttl,
+    maxsize=settings.etag_cache_max_entries,
+)
+
+
+class CachedJSONResponse:
+    """
+    Response whose JSON body is already parsed (fresh 200 or served on a 304).
+    Only exposes what callers of conditional_get use: status_code, headers, json().
+    The body is shared with the cache, so callers must not mutate it.
+    """
+
+    def __init__(self, data: Any, headers: httpx.Headers, from_cache: bool = False):
+        self.status_code = 200
+        self.headers = headers
+        self.from_cache = from_cache
+        self._data = data
+
+    def json(self) -> Any:
+        return self._data
+
+
+def _etag_key(url: str, params: Optional[dict], headers: Optional[dict]) -> str:
+    # API keys and bearer tokens end up in the key, so only a digest is stored
+    query = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    auth = (headers or {}).get("Authorization", "")
+    return digest(f"{url}?{query}|{auth}")
+
+
+async def conditional_get(
+    client: httpx.AsyncClient,
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    **kwargs,
+):
+    """
+    GET with If-None-Match revalidation.
+    Returns a CachedJSONResponse for 200s carrying an ETag and for 304s,
+    otherwise the raw httpx response.
+    """
+    key = _etag_key(url, params, headers)
+    known = etag_cache.get(key)
+
+    request_headers = dict(headers or {})
+    if known is not None:
+        request_headers["If-None-Match"] = known[0]
+
+    response = await client.get(url, params=params, headers=request_headers, **kwargs)
+
+    if response.status_code == 304 and known is not None:
+        etag_cache.set(key, known)
+        return CachedJSONResponse(known[1], response.headers, from_cache=True)
+
+    etag = response.headers.get("ETag")
+    if response.status_code == 200 and etag:
+        data = response.json()
+        etag_cache.set(key, (etag, data))
+        return CachedJSONResponse(data, response.headers)
+
+    return response
@@ -0,0 +1,226 @@
+"""
+Client-side rate limiting and daily quota accounting for upstream APIs.
+
+Every upstream (YouTube, Graph API, Gemini, ...) has a token bucket per API
+key or access token, so two keys for the same service get separate budgets.
+When a bucket is empty the caller either waits its turn (queue mode) or
+gets RateLimitExceeded straight away (reject mode). Daily quotas count
+units, not requests (a YouTube search.list costs 100) and reset at
+midnight in the upstream's quota timezone (UTC unless configured; YouTube
+resets at midnight Pacific time).
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from .cache import digest
+from .config import get_settings
+
+settings = get_settings()
+
+QUEUE = "queue"
+REJECT = "reject"
+
+
+class RateLimitExceeded(Exception):
+    """The upstream's request rate or daily quota budget is exhausted."""
+
+    def __init__(self, upstream: str, reason: str, retry_after: Optional[float] = None):
+        self.upstream = upstream
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"{upstream} rate limit exceeded: {reason}")
+
+
+def _seconds_until_midnight(tz: tzinfo = timezone.utc) -> float:
+    now = datetime.now(tz)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` tokens/second.
+    Reservations may drive the balance negative; the deficit is the wait
+    time of the callers queued behind, which keeps waiters in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` would be available."""
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens now and return how long the caller must wait to use them."""
+        wait = self.wait_time(tokens)
+        self.tokens -= tokens
+        return wait
+
+    def refund(self, tokens: float = 1.0) -> None:
+        self.tokens += tokens
+
+
+class DailyQuota:
+    """Units used today (in tz) against a daily limit (0 = unlimited)."""
+
+    def __init__(self, limit: int, tz: tzinfo = timezone.utc):
+        self.limit = limit
+        self.tz = tz
+        self.used = 0
+        self.day = datetime.now(tz).date()
+
+    def _roll(self) -> None:
+        today = datetime.now(self.tz).date()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    def remaining(self) -> Optional[int]:
+        self._roll()
+        return max(0, self.limit - self.used) if self.limit else None
+
+    def charge(self, units: int) -> bool:
+        """Record units if they fit in today's budget."""
+        self._roll()
+        if self.limit and self.used + units > self.limit:
+            return False
+        self.used += units
+        return True
+
+
+class RateLimiter:
+    """Token buckets and daily quotas for one upstream, keyed per API key."""
+
+    def __init__(
+        self,
+        upstream: str,
+        requests_per_minute: float,
+        daily_quota: int = 0,
+        mode: Optional[str] = None,
+        reset_timezone: str = "UTC",
+    ):
+        self.upstream = upstream
+        self.requests_per_minute = requests_per_minute
+        self.daily_quota = daily_quota
+        self.reset_timezone = reset_timezone
+        self.tz = ZoneInfo(reset_timezone)
+        self.mode = mode or settings.rate_limit_mode
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._quotas: Dict[str, DailyQuota] = {}
+        self.waited = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _key_id(key: Optional[str]) -> str:
+        # Only a short digest of the key is kept (it also shows up in stats)
+        return digest(key)[:8] if key else "default"
+
+    def _bucket(self, key_id: str) -> TokenBucket:
+        bucket = self._buckets.get(key_id)
+        if bucket is None:
+            bucket = TokenBucket(self.requests_per_minute / 60.0, max(1.0, self.requests_per_minute))
+            self._buckets[key_id] = bucket
+        return bucket
+
+    def _quota(self, key_id: str) -> DailyQuota:
+        quota = self._quotas.get(key_id)
+        if quota is None:
+            quota = DailyQuota(self.daily_quota, self.tz)
+            self._quotas[key_id] = quota
+        return quota
+
+    async def acquire(
+        self,
+        key: Optional[str] = None,
+        cost: int = 1,
+        mode: Optional[str] = None,
+        requests: int = 1,
+    ) -> None:
+        """
+        Take `requests` request slots and `cost` quota units for key.
+        Quota units and request slots differ for YouTube (a search.list is
+        one request costing 100 units) and match for batched Graph calls.
+        Raises RateLimitExceeded if the daily quota is spent, or if the
+        bucket is short in reject mode (or would take longer than
+        rate_limit_max_wait in queue mode).
+        """
+        mode = mode or self.mode
+        key_id = self._key_id(key)
+        quota = self._quota(key_id)
+        bucket = self._bucket(key_id)
+
+        if not quota.charge(cost):
+            self.rejected += 1
+            raise RateLimitExceeded(self.upstream, "daily quota exhausted", _seconds_until_midnight(self.tz))
+
+        wait = bucket.wait_time(requests)
+        if wait > 0 and (mode == REJECT or wait > settings.rate_limit_max_wait):
+            quota.used -= cost
+            self.rejected += 1
+            raise RateLimitExceeded(self.upstream, "too many requests", wait)
+
+        wait = bucket.reserve(requests)
+        if wait > 0:
+            self.waited += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                bucket.refund(requests)
+                quota.used -= cost
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        keys = {}
+        for key_id, quota in self._quotas.items():
+            bucket = self._bucket(key_id)
+            bucket._refill()
+            keys[key_id] = {
+                "used_today": quota.used,
+                "remaining_today": quota.remaining(),
+                "tokens": round(bucket.tokens, 2),
+            }
+        return {
+            "mode": self.mode,
+            "requests_per_minute": self.requests_per_minute,
+            "daily_quota": self.daily_quota or None,
+            "quota_resets": f"midnight {self.reset_timezone}",
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "keys": keys,
+        }
+
+
+# One limiter per upstream
+rate_limits: Dict[str, RateLimiter] = {
+    "youtube": RateLimiter(
+        "youtube", settings.youtube_requests_per_minute, settings.youtube_daily_quota,
+        reset_timezone=settings.youtube_quota_timezone,
+    ),
+    "instagram": RateLimiter("instagram", settings.instagram_requests_per_minute, settings.instagram_daily_quota),
+    "gemini": RateLimiter("gemini", settings.gemini_requests_per_minute, settings.gemini_daily_quota),
+    "huggingface": RateLimiter("huggingface", settings.huggingface_requests_per_minute, settings.huggingface_daily_quota),
+    "elevenlabs": RateLimiter("elevenlabs", settings.elevenlabs_requests_per_minute, settings.elevenlabs_daily_quota),
+}
+
+
+def get_rate_limiter(upstream: str) -> RateLimiter:
+    """Get the limiter for an upstream."""
+    return rate_limits[upstream]
+
+
+def quota_stats() -> Dict[str, Dict[str, Any]]:
+    """Usage and remaining budget for every upstream and key."""
+    return {name: limiter.stats() for name, limiter in rate_limits.items()}
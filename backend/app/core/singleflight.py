@@ -0,0 +1,70 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key await one shared upstream call
+instead of each sending their own. The call runs as a task shielded from
+individual callers, so one caller giving up does not cancel it for others.
+"""
+import asyncio
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Deduplicates concurrent in-flight calls by key."""
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a call for key is currently running."""
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn for key, or join the call already in flight for it."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.calls += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
+
+
+def coalesced(flight: SingleFlight, key: Callable[..., Optional[Hashable]]):
+    """
+    Coalesce concurrent calls of an async function.
+
+    `key` receives the same arguments as the wrapped function. Returning
+    None runs the call without coalescing.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            flight_key = key(*args, **kwargs)
+            if flight_key is None:
+                return await fn(*args, **kwargs)
+            return await flight.do(flight_key, lambda: fn(*args, **kwargs))
+
+        wrapper.flight = flight
+        return wrapper
+
+    return decorator
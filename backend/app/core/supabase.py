@@ -1,6 +1,9 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client, Client
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 from .config import get_settings
+from .deadline import with_deadline
 
 settings = get_settings()
 
@@ -12,6 +15,14 @@ supabase_admin: Optional[Client] = None
 if settings.supabase_service_key:
     supabase_admin = create_client(settings.supabase_url, settings.supabase_service_key)
 
+# The supabase client is synchronous. Queries run on this bounded pool so a slow
+# PostgREST round-trip never blocks the event loop, and the shared clients above
+# keep reusing their pooled connections.
+_db_executor = ThreadPoolExecutor(
+    max_workers=settings.db_max_workers,
+    thread_name_prefix="supabase",
+)
+
 
 def get_supabase() -> Client:
     """Get Supabase client dependency."""
@@ -21,3 +32,47 @@ def get_supabase() -> Client:
 def get_supabase_admin() -> Optional[Client]:
     """Get Supabase admin client dependency (may be None)."""
     return supabase_admin
+
+
+async def execute(query) -> Any:
+    """
+    Run a built query (table/rpc builder) off the event loop.
+    Bounded by the request deadline; the worker thread finishes regardless.
+    """
+    loop = asyncio.get_running_loop()
+    return await with_deadline(loop.run_in_executor(_db_executor, query.execute))
+
+
+async def execute_paged(build_query: Callable[[], Any], page_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run `build_query().range(...)` a page at a time and return every row.
+    PostgREST silently truncates a response at its max-rows setting, so reads
+    that can outgrow it page explicitly. build_query must return a fresh,
+    deterministically ordered builder.
+    """
+    page_size = page_size or settings.db_page_size
+    rows: List[Dict[str, Any]] = []
+    while True:
+        start = len(rows)
+        response = await execute(build_query().range(start, start + page_size - 1))
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+
+def flatten_embedded(rows: List[Dict[str, Any]], resource: str) -> List[Dict[str, Any]]:
+    """Lift an embedded resource's columns (e.g. posts!inner(...)) onto each row."""
+    flat = []
+    for row in rows:
+        row = dict(row)
+        embedded = row.pop(resource, None) or {}
+        if isinstance(embedded, list):
+            embedded = embedded[0] if embedded else {}
+        flat.append({**embedded, **row})
+    return flat
+
+
+def shutdown_db_executor() -> None:
+    """Stop accepting queries and let in-flight ones finish."""
+    _db_executor.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import json
 
+from app.core.cache import cache_stats
+from app.core.circuit_breaker import breaker_stats
 from app.core.config import get_settings
+from app.core.deadline import DeadlineMiddleware
+from app.core.http import http_clients
+from app.core.supabase import shutdown_db_executor
 from app.routers import analytics, platforms, ai, reports, voice_coach, hooks, users, competitors, admin
 from app.routers.oauth import router as oauth_router
+from app.services.channel_index import channel_index
 
 
 settings = get_settings()
@@ -27,9 +36,17 @@ async def lifespan(app: FastAPI):
     check_key("Hugging Face", settings.huggingface_api_key)
     check_key("Supabase URL", settings.supabase_url)
     
+    # Shared pooled HTTP clients for all upstream APIs
+    await http_clients.startup()
+    
+    # Warm the YouTube handle -> channel ID index
+    await channel_index.load()
+    
     yield
     # Shutdown
     print("👋 Social Leaf Backend shutting down...")
+    await http_clients.aclose()
+    shutdown_db_executor()
 
 
 app = FastAPI(
@@ -39,6 +56,10 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Request-scoped time budgets (X-Request-Timeout header or settings.request_timeout).
+# Added before CORS so CORS wraps it and its 504s carry CORS headers.
+app.add_middleware(DeadlineMiddleware)
+
 # CORS middleware - Allow all origins in development
 app.add_middleware(
     CORSMiddleware,
@@ -90,7 +111,12 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "social-leaf-api"}
+    return {
+        "status": "healthy",
+        "service": "social-leaf-api",
+        "caches": cache_stats(),
+        "circuits": breaker_stats(),
+    }
 
 
 # ================== YOUTUBE PUBLIC API (API Key Only) ==================
@@ -118,8 +144,37 @@ async def get_youtube_channel(channel_id: str):
     }
 
 
+async def _ndjson(items):
+    """Serialize an async iterator of dicts as newline-delimited JSON."""
+    async for item in items:
+        yield json.dumps(item) + "\n"
+
+
+@app.get("/api/youtube/stream/{channel_id}")
+async def stream_youtube_channel_videos(
+    channel_id: str,
+    max_videos: int = Query(settings.youtube_stream_max_videos, ge=1, le=settings.youtube_stream_max_videos),
+):
+    """Stream a channel's full upload history with stats as NDJSON (one video per line)."""
+    from app.services.youtube import YouTubeService
+    service = YouTubeService()
+    return StreamingResponse(
+        _ndjson(service.iter_channel_videos(channel_id, max_videos=max_videos)),
+        media_type="application/x-ndjson",
+    )
+
+
 # ================== REAL PLATFORM DATA (OAuth Required) ==================
 
+@app.get("/api/real/youtube/stream")
+async def stream_real_youtube_videos(
+    max_videos: int = Query(settings.youtube_stream_max_videos, ge=1, le=settings.youtube_stream_max_videos),
+):
+    """Stream the connected channel's full upload history with stats as NDJSON."""
+    from app.services.youtube_service import iter_all_videos
+    return StreamingResponse(_ndjson(iter_all_videos(max_videos)), media_type="application/x-ndjson")
+
+
 @app.get("/api/real/youtube")
 @app.get("/api/real/youtube")
 async def get_real_youtube(handle: str = None):
@@ -198,45 +253,77 @@ async def get_real_linkedin():
     return data
 
 
+async def _fetch_with_budget(platform: str, fetch, timeout: float):
+    """Run one platform fetch within its time budget. Returns (data, status)."""
+    try:
+        return await asyncio.wait_for(fetch(), timeout=timeout), "ok"
+    except asyncio.TimeoutError:
+        print(f"⏱️ /api/real/all: {platform} timed out after {timeout}s")
+        return {"connected": True, "error": "timeout"}, "timeout"
+    except Exception as e:
+        print(f"❌ /api/real/all: {platform} failed: {e}")
+        return {"connected": True, "error": str(e)}, "error"
+
+
 @app.get("/api/real/all")
 @app.get("/api/real/all")
 async def get_all_real_data(yt_handle: str = None, ig_handle: str = None):
-    """Get all real platform data (uses OAuth tokens or Public Handles)."""
+    """Get all real platform data (uses OAuth tokens or Public Handles).
+    
+    Platforms are fetched concurrently, each within its own time budget.
+    `platform_status` marks platforms that timed out or failed; the
+    platforms that finished are still returned.
+    """
     from app.services.youtube_service import get_youtube_analytics
     from app.services.instagram_service import get_instagram_insights
     from app.services.twitter_service import get_twitter_analytics
     from app.services.linkedin_service import get_linkedin_analytics
     from app.routers.oauth import get_tokens
     
-    result = {}
+    fetchers = {}
     
     # YouTube
     if yt_handle:
-        result["youtube"] = await get_real_youtube(handle=yt_handle)
+        fetchers["youtube"] = lambda: get_real_youtube(handle=yt_handle)
     elif get_tokens("youtube"):
-        result["youtube"] = await get_youtube_analytics()
-    else:
-        result["youtube"] = {"connected": False}
+        fetchers["youtube"] = get_youtube_analytics
     
     # Instagram
     if ig_handle:
-        result["instagram"] = await get_real_instagram(handle=ig_handle)
+        fetchers["instagram"] = lambda: get_real_instagram(handle=ig_handle)
     elif get_tokens("instagram"):
-        result["instagram"] = await get_instagram_insights()
-    else:
-        result["instagram"] = {"connected": False}
+        fetchers["instagram"] = get_instagram_insights
     
     # Twitter & LinkedIn (No simulator requested yet)
     if get_tokens("twitter"):
-        result["twitter"] = await get_twitter_analytics()
-    else:
-        result["twitter"] = {"connected": False}
-    
+        fetchers["twitter"] = get_twitter_analytics
     if get_tokens("linkedin"):
-        result["linkedin"] = await get_linkedin_analytics()
-    else:
-        result["linkedin"] = {"connected": False}
+        fetchers["linkedin"] = get_linkedin_analytics
+    
+    budgets = {
+        "youtube": settings.real_all_youtube_timeout,
+        "instagram": settings.real_all_instagram_timeout,
+        "twitter": settings.real_all_twitter_timeout,
+        "linkedin": settings.real_all_linkedin_timeout,
+    }
+    
+    outcomes = await asyncio.gather(*(
+        _fetch_with_budget(platform, fetch, budgets[platform])
+        for platform, fetch in fetchers.items()
+    ))
+    finished = dict(zip(fetchers.keys(), outcomes))
+    
+    result = {}
+    platform_status = {}
+    for platform in ["youtube", "instagram", "twitter", "linkedin"]:
+        if platform in finished:
+            result[platform], platform_status[platform] = finished[platform]
+        else:
+            result[platform] = {"connected": False}
+            platform_status[platform] = "not_connected"
     
+    result["platform_status"] = platform_status
+    result["partial"] = any(s in ("timeout", "error") for s in platform_status.values())
     return result
 
 
@@ -7,6 +7,7 @@ class Metrics(BaseModel):
     """Metrics model."""
     id: str
     post_id: str
+    user_id: str
     likes: int = 0
     comments: int = 0
     shares: int = 0
@@ -22,6 +23,7 @@ class Metrics(BaseModel):
 class MetricsCreate(BaseModel):
     """Metrics creation model."""
     post_id: str
+    user_id: Optional[str] = None  # Filled from the post by a DB trigger if omitted
     likes: int = 0
     comments: int = 0
     shares: int = 0
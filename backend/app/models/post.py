@@ -15,6 +15,7 @@ class Post(BaseModel):
     media_url: Optional[str] = None
     permalink: Optional[str] = None
     posted_at: Optional[datetime] = None
+    metrics_fingerprint: Optional[str] = None  # Counters of the last metrics snapshot written
     created_at: datetime
 
 
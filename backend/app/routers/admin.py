@@ -4,6 +4,7 @@ from typing import Dict, Any, List, Optional
 from app.services.admin_service import admin_service
 from app.services.user_service import user_service
 from app.core.auth import get_current_user, TokenData
+from app.core.rate_limit import quota_stats
 
 router = APIRouter(
     prefix="/admin",
@@ -107,6 +108,11 @@ async def update_settings(
         raise HTTPException(status_code=400, detail="Failed to update settings")
     return {"status": "success"}
 
+@router.get("/quotas")
+async def get_quotas(user: TokenData = Depends(require_admin)) -> Dict[str, Any]:
+    """Get upstream API rate limit and daily quota usage."""
+    return quota_stats()
+
 @router.post("/system/notify-maintenance")
 async def notify_maintenance(
     payload: Dict[str, str] = Body(...),
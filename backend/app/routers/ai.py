@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+import asyncio
 import openai
 
 from app.core.auth import get_current_user, TokenData
 from app.core.config import get_settings
-from app.core.supabase import get_supabase
+from app.core.deadline import DeadlineExceeded
+from app.core.supabase import execute, get_supabase
 
 router = APIRouter()
 settings = get_settings()
@@ -65,7 +67,9 @@ async def natural_language_query(
 
         metrics_query = supabase.table("metrics").select(
             "post_id, likes, comments, shares, engagement_rate, collected_at"
-        ).order("collected_at", desc=True).limit(100)
+        ).eq("user_id", current_user.user_id).order(
+            "collected_at", desc=True
+        ).limit(100)
 
         # Apply platform filter if not 'all'
         if request.platform and request.platform.lower() != 'all':
@@ -78,8 +82,11 @@ async def natural_language_query(
             # but usually it's passed or can be inferred. 
             # To be safe, we will just filter the posts for now which give the content context.
             
-        posts_response = posts_query.execute()
-        metrics_response = metrics_query.execute()
+        # Both queries run on the Supabase pool, concurrently, within the request deadline
+        posts_response, metrics_response = await asyncio.gather(
+            execute(posts_query),
+            execute(metrics_query),
+        )
         
         if request.platform.lower() in ['all', 'youtube']:
             real_youtube_data = {}
@@ -103,6 +110,8 @@ async def natural_language_query(
                                 for v in yt_analytics.get("recent_videos", [])[:5]
                             ]
                         }
+                except DeadlineExceeded:
+                    raise
                 except Exception as e:
                     print(f"Error fetching YouTube OAuth context: {e}")
             
@@ -138,6 +147,8 @@ async def natural_language_query(
                                 for v in videos
                             ]
                         }
+                 except DeadlineExceeded:
+                     raise
                  except Exception as e:
                      print(f"Error fetching YouTube Public context: {e}")
 
@@ -156,6 +167,8 @@ async def natural_language_query(
         
         return QueryResponse(answer=answer, data={"posts_analyzed": len(posts_response.data)})
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -170,9 +183,9 @@ async def get_insights(
     supabase = get_supabase()
     
     try:
-        response = supabase.table("insights").select("*").eq(
+        response = await execute(supabase.table("insights").select("*").eq(
             "user_id", current_user.user_id
-        ).order("generated_at", desc=True).limit(10).execute()
+        ).order("generated_at", desc=True).limit(10))
         
         return [
             InsightResponse(
@@ -183,6 +196,8 @@ async def get_insights(
             for insight in response.data
         ]
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -198,9 +213,9 @@ async def generate_insights(
     
     try:
         # Get recent metrics
-        metrics = supabase.table("metrics").select("*").order(
-            "collected_at", desc=True
-        ).limit(100).execute()
+        metrics = await execute(supabase.table("metrics").select("*").eq(
+            "user_id", current_user.user_id
+        ).order("collected_at", desc=True).limit(100))
         
         # Generate insight using AI
         if settings.openai_api_key:
@@ -226,14 +241,16 @@ async def generate_insights(
             summary = "Your Reels receive 43% higher engagement than images, especially when posted after 8 PM. Consider creating more short-form video content."
         
         # Save insight
-        result = supabase.table("insights").insert({
+        result = await execute(supabase.table("insights").insert({
             "user_id": current_user.user_id,
             "summary": summary,
             "generated_at": datetime.now().isoformat()
-        }).execute()
+        }))
         
         return {"message": "Insight generated", "insight": summary}
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -248,9 +265,9 @@ async def get_recommendations(
     supabase = get_supabase()
     
     try:
-        response = supabase.table("recommendations").select("*").eq(
+        response = await execute(supabase.table("recommendations").select("*").eq(
             "user_id", current_user.user_id
-        ).order("generated_at", desc=True).limit(10).execute()
+        ).order("generated_at", desc=True).limit(10))
         
         return [
             RecommendationResponse(
@@ -262,6 +279,8 @@ async def get_recommendations(
             for rec in response.data
         ]
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -329,9 +348,9 @@ async def get_audience_persona(
     supabase = get_supabase()
     
     # Get YouTube connection
-    youtube_conn = supabase.table("platform_connections").select("*").eq(
+    youtube_conn = await execute(supabase.table("platform_connections").select("*").eq(
         "user_id", current_user.user_id
-    ).eq("platform", "youtube").maybe_single().execute()
+    ).eq("platform", "youtube").maybe_single())
     
     if not youtube_conn.data:
         raise HTTPException(status_code=404, detail="YouTube not connected")
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional
-from datetime import datetime, timedelta
 from pydantic import BaseModel
 
 from app.core.auth import get_current_user, TokenData
-from app.core.supabase import get_supabase
+from app.core.deadline import DeadlineExceeded
+from app.services.analytics_engine import get_metrics_summary
 
 router = APIRouter()
 
@@ -43,18 +43,12 @@ async def get_analytics_overview(
     from app.services.instagram_service import get_instagram_insights
     from app.services.youtube_service import get_youtube_analytics
     
-    supabase = get_supabase()
-    
     try:
-        # Get metrics from database
-        since_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        response = supabase.table("metrics").select(
-            "likes, comments, shares, reach, impressions, engagement_rate"
-        ).gte("collected_at", since_date).execute()
+        # Aggregated server-side: one row however long the post history is
+        summary = await get_metrics_summary(current_user.user_id, days)
         
         # If no data, return mock data for demo
-        if not response.data:
+        if not summary or not summary["metric_rows"]:
             # TRY REAL DATA FIRST
             try:
                 # Instagram
@@ -97,6 +91,8 @@ async def get_analytics_overview(
                         total_shares=total_shares,
                         growth_rate=0.0 # Cannot calc growth without history
                     )
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 print(f"Real data fetch failed: {e}")
             
@@ -104,12 +100,11 @@ async def get_analytics_overview(
             mock = get_mock_analytics_overview(current_user.user_id)
             return AnalyticsOverview(**mock)
         
-        # Aggregate metrics
-        total_impressions = sum(m.get("impressions", 0) for m in response.data)
-        total_comments = sum(m.get("comments", 0) for m in response.data)
-        total_shares = sum(m.get("shares", 0) for m in response.data)
-        total_likes = sum(m.get("likes", 0) for m in response.data)
-        total_reach = sum(m.get("reach", 0) for m in response.data)
+        total_impressions = int(summary["total_impressions"])
+        total_comments = int(summary["total_comments"])
+        total_shares = int(summary["total_shares"])
+        total_likes = int(summary["total_likes"])
+        total_reach = int(summary["total_reach"])
         
         # Calculate engagement rate
         engagement_rate = 0.0
@@ -121,9 +116,11 @@ async def get_analytics_overview(
             engagement_rate=round(engagement_rate, 2),
             total_comments=total_comments,
             total_shares=total_shares,
-            growth_rate=12.5  # TODO: Calculate from historical data
+            growth_rate=float(summary["growth_rate"]) if summary.get("growth_rate") is not None else 0.0  # No baseline yet
         )
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         # On any error, return mock data for demo
         mock = get_mock_analytics_overview(current_user.user_id)
@@ -146,17 +143,10 @@ async def get_platform_analytics(
     from app.services.instagram_service import get_instagram_insights
     from app.services.youtube_service import get_youtube_analytics
     
-    supabase = get_supabase()
-    
     try:
-        since_date = (datetime.now() - timedelta(days=days)).isoformat()
+        summary = await get_metrics_summary(current_user.user_id, days, platform)
         
-        # Get posts for this platform
-        posts_response = supabase.table("posts").select("id").eq(
-            "platform", platform
-        ).eq("user_id", current_user.user_id).execute()
-        
-        if not posts_response.data:
+        if not summary or not summary["post_count"]:
             # TRY REAL DATA
             try:
                 if platform == "instagram":
@@ -186,6 +176,8 @@ async def get_platform_analytics(
                             shares=0, # YT API doesn't give shares easily
                             engagement_rate=m.get("engagement_rate", 0.0)
                         )
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 print(f"Real platform fetch failed: {e}")
 
@@ -193,23 +185,15 @@ async def get_platform_analytics(
             mock = get_mock_platform_metrics(platform)
             return PlatformMetrics(**mock)
         
-        post_ids = [p["id"] for p in posts_response.data]
-        
-        # Get metrics for these posts
-        metrics_response = supabase.table("metrics").select(
-            "likes, comments, shares, reach, impressions"
-        ).in_("post_id", post_ids).gte("collected_at", since_date).execute()
-        
-        if not metrics_response.data:
+        if not summary["metric_rows"]:
             mock = get_mock_platform_metrics(platform)
             return PlatformMetrics(**mock)
         
-        # Aggregate
-        total_impressions = sum(m.get("impressions", 0) for m in metrics_response.data)
-        total_likes = sum(m.get("likes", 0) for m in metrics_response.data)
-        total_comments = sum(m.get("comments", 0) for m in metrics_response.data)
-        total_shares = sum(m.get("shares", 0) for m in metrics_response.data)
-        total_reach = sum(m.get("reach", 0) for m in metrics_response.data)
+        total_impressions = int(summary["total_impressions"])
+        total_likes = int(summary["total_likes"])
+        total_comments = int(summary["total_comments"])
+        total_shares = int(summary["total_shares"])
+        total_reach = int(summary["total_reach"])
         
         engagement_rate = 0.0
         if total_reach > 0:
@@ -224,6 +208,8 @@ async def get_platform_analytics(
             engagement_rate=round(engagement_rate, 2)
         )
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         # Return mock data on error
         mock = get_mock_platform_metrics(platform)
@@ -244,6 +230,8 @@ async def compare_platforms(
         try:
             metrics = await get_platform_analytics(platform, 30, current_user)
             results.append(metrics.model_dump())
+        except DeadlineExceeded:
+            raise
         except:
             pass
     
@@ -3,13 +3,13 @@ OAuth routes for social media platform authentication.
 """
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import RedirectResponse
-import httpx
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
 from app.core.oauth import oauth_settings, OAUTH_URLS, get_oauth_url
 from app.core.config import get_settings
+from app.core.http import get_http_client
 
 router = APIRouter(prefix="/auth", tags=["OAuth"])
 
@@ -108,17 +108,17 @@ async def youtube_callback(code: str = Query(...), state: str = Query(...)):
         raise HTTPException(status_code=400, detail="Invalid or expired state")
     
     # Exchange code for tokens
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            OAUTH_URLS["youtube"]["token"],
-            data={
-                "client_id": oauth_settings.YOUTUBE_CLIENT_ID,
-                "client_secret": oauth_settings.YOUTUBE_CLIENT_SECRET,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": oauth_settings.YOUTUBE_REDIRECT_URI,
-            },
-        )
+    client = get_http_client("oauth")
+    response = await client.post(
+        OAUTH_URLS["youtube"]["token"],
+        data={
+            "client_id": oauth_settings.YOUTUBE_CLIENT_ID,
+            "client_secret": oauth_settings.YOUTUBE_CLIENT_SECRET,
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": oauth_settings.YOUTUBE_REDIRECT_URI,
+        },
+    )
     
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
@@ -153,17 +153,17 @@ async def instagram_callback(code: str = Query(...), state: str = Query(...)):
         raise HTTPException(status_code=400, detail="Invalid or expired state")
     
     # Exchange code for tokens
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            OAUTH_URLS["instagram"]["token"],
-            params={
-                "client_id": oauth_settings.INSTAGRAM_APP_ID,
-                "client_secret": oauth_settings.INSTAGRAM_APP_SECRET,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": oauth_settings.INSTAGRAM_REDIRECT_URI,
-            },
-        )
+    client = get_http_client("oauth")
+    response = await client.get(
+        OAUTH_URLS["instagram"]["token"],
+        params={
+            "client_id": oauth_settings.INSTAGRAM_APP_ID,
+            "client_secret": oauth_settings.INSTAGRAM_APP_SECRET,
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": oauth_settings.INSTAGRAM_REDIRECT_URI,
+        },
+    )
     
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
@@ -202,20 +202,20 @@ async def twitter_callback(code: str = Query(...), state: str = Query(...)):
         f"{oauth_settings.TWITTER_CLIENT_ID}:{oauth_settings.TWITTER_CLIENT_SECRET}".encode()
     ).decode()
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            OAUTH_URLS["twitter"]["token"],
-            headers={
-                "Authorization": f"Basic {credentials}",
-                "Content-Type": "application/x-www-form-urlencoded",
-            },
-            data={
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": oauth_settings.TWITTER_REDIRECT_URI,
-                "code_verifier": "challenge",  # PKCE
-            },
-        )
+    client = get_http_client("oauth")
+    response = await client.post(
+        OAUTH_URLS["twitter"]["token"],
+        headers={
+            "Authorization": f"Basic {credentials}",
+            "Content-Type": "application/x-www-form-urlencoded",
+        },
+        data={
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": oauth_settings.TWITTER_REDIRECT_URI,
+            "code_verifier": "challenge",  # PKCE
+        },
+    )
     
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
@@ -249,18 +249,18 @@ async def linkedin_callback(code: str = Query(...), state: str = Query(...)):
         raise HTTPException(status_code=400, detail="Invalid or expired state")
     
     # Exchange code for tokens
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            OAUTH_URLS["linkedin"]["token"],
-            data={
-                "client_id": oauth_settings.LINKEDIN_CLIENT_ID,
-                "client_secret": oauth_settings.LINKEDIN_CLIENT_SECRET,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": oauth_settings.LINKEDIN_REDIRECT_URI,
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
+    client = get_http_client("oauth")
+    response = await client.post(
+        OAUTH_URLS["linkedin"]["token"],
+        data={
+            "client_id": oauth_settings.LINKEDIN_CLIENT_ID,
+            "client_secret": oauth_settings.LINKEDIN_CLIENT_SECRET,
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": oauth_settings.LINKEDIN_REDIRECT_URI,
+        },
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
     
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail=f"Token exchange failed: {response.text}")
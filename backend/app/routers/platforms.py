@@ -4,7 +4,8 @@ from pydantic import BaseModel
 from datetime import datetime
 
 from app.core.auth import get_current_user, TokenData
-from app.core.supabase import get_supabase
+from app.core.deadline import DeadlineExceeded
+from app.core.supabase import execute, get_supabase
 
 router = APIRouter()
 
@@ -35,9 +36,9 @@ async def get_connected_platforms(
     supabase = get_supabase()
     
     try:
-        response = supabase.table("platforms").select(
+        response = await execute(supabase.table("platforms").select(
             "platform_name, connected_at"
-        ).eq("user_id", current_user.user_id).execute()
+        ).eq("user_id", current_user.user_id))
         
         connected = {p["platform_name"]: p["connected_at"] for p in response.data}
         
@@ -52,6 +53,8 @@ async def get_connected_platforms(
             for platform in all_platforms
         ]
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -71,29 +74,31 @@ async def connect_platform(
     
     try:
         # Check if already connected
-        existing = supabase.table("platforms").select("id").eq(
+        existing = await execute(supabase.table("platforms").select("id").eq(
             "user_id", current_user.user_id
-        ).eq("platform_name", connection.platform_name).execute()
+        ).eq("platform_name", connection.platform_name))
         
         if existing.data:
             # Update existing connection
-            response = supabase.table("platforms").update({
+            response = await execute(supabase.table("platforms").update({
                 "access_token": connection.access_token,
                 "refresh_token": connection.refresh_token,
                 "connected_at": datetime.now().isoformat()
-            }).eq("id", existing.data[0]["id"]).execute()
+            }).eq("id", existing.data[0]["id"]))
         else:
             # Create new connection
-            response = supabase.table("platforms").insert({
+            response = await execute(supabase.table("platforms").insert({
                 "user_id": current_user.user_id,
                 "platform_name": connection.platform_name,
                 "access_token": connection.access_token,
                 "refresh_token": connection.refresh_token,
                 "connected_at": datetime.now().isoformat()
-            }).execute()
+            }))
         
         return {"message": f"{connection.platform_name} connected successfully"}
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -109,12 +114,14 @@ async def disconnect_platform(
     supabase = get_supabase()
     
     try:
-        response = supabase.table("platforms").delete().eq(
+        response = await execute(supabase.table("platforms").delete().eq(
             "user_id", current_user.user_id
-        ).eq("platform_name", platform_name).execute()
+        ).eq("platform_name", platform_name))
         
         return {"message": f"{platform_name} disconnected successfully"}
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -9,7 +9,9 @@ import smtplib
 import ssl
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from app.core.supabase import get_supabase_admin
+from app.core.deadline import DeadlineExceeded
+from app.core.supabase import execute, get_supabase_admin
+from app.services.user_service import user_service
 
 class AdminService:
     """Service for admin-only operations."""
@@ -25,15 +27,14 @@ class AdminService:
         try:
             # Get total users count
             # Note: count='exact' is more efficient than fetching all rows
-            users_res = self.supabase.table("profiles").select("id", count="exact").execute()
+            users_res = await execute(self.supabase.table("profiles").select("id", count="exact"))
             total_users = users_res.count if users_res.count is not None else 0
             
             # Get active subscriptions (simplified: non-null plan or plan_status='active')
             # Adjust query based on your exact business logic for "active"
-            active_res = self.supabase.table("profiles")\
+            active_res = await execute(self.supabase.table("profiles")\
                 .select("id", count="exact")\
-                .neq("plan", "starter")\
-                .execute()
+                .neq("plan", "starter"))
             active_subs = active_res.count if active_res.count is not None else 0
             
             # Calculate MRR (Estimated)
@@ -41,7 +42,7 @@ class AdminService:
             # In a real app, you'd sum actual subscription values
             # Here we just estimate based on plan counts
             
-            plans_res = self.supabase.table("profiles").select("plan").execute()
+            plans_res = await execute(self.supabase.table("profiles").select("plan"))
             mrr = 0
             for row in plans_res.data:
                 p = row.get("plan")
@@ -53,6 +54,8 @@ class AdminService:
                 "active_subscriptions": active_subs,
                 "mrr": mrr
             }
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error fetching admin analytics: {e}")
             return {"total_users": 0, "active_subscriptions": 0, "mrr": 0}
@@ -62,7 +65,7 @@ class AdminService:
         Get distribution of users across different plans.
         """
         try:
-            res = self.supabase.table("profiles").select("plan").execute()
+            res = await execute(self.supabase.table("profiles").select("plan"))
             
             plans = {}
             for row in res.data:
@@ -73,6 +76,8 @@ class AdminService:
                 {"name": k.capitalize(), "value": v} 
                 for k, v in plans.items()
             ]
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error fetching plan distribution: {e}")
             return []
@@ -88,7 +93,7 @@ class AdminService:
             # In real prod: COUNT(social_connections) GROUP BY platform
             # Here: Simulate 60% YT, 40% IG, 20% Twitter
             
-            users_res = self.supabase.table("profiles").select("id", count="exact").execute()
+            users_res = await execute(self.supabase.table("profiles").select("id", count="exact"))
             total = users_res.count or 1
             
             return [
@@ -97,6 +102,8 @@ class AdminService:
                 {"platform": "Twitter", "connected_users": int(total * 0.2), "percentage": 20},
                 {"platform": "LinkedIn", "connected_users": int(total * 0.15), "percentage": 15},
             ]
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error fetching platform stats: {e}")
             return []
@@ -107,13 +114,14 @@ class AdminService:
         """
         try:
             # Fetch profiles sorted by created_at desc
-            res = self.supabase.table("profiles")\
+            res = await execute(self.supabase.table("profiles")\
                 .select("id, email, role, plan, created_at")\
                 .order("created_at", desc=True)\
-                .limit(10)\
-                .execute()
+                .limit(10))
                 
             return res.data
+        except DeadlineExceeded:
+            raise
         except Exception as e:
              print(f"Error fetching recent users: {e}")
              return []
@@ -132,7 +140,7 @@ class AdminService:
             start = (page - 1) * per_page
             end = start + per_page - 1
             
-            res = query.range(start, end).order("created_at", desc=True).execute()
+            res = await execute(query.range(start, end).order("created_at", desc=True))
             
             return {
                 "data": res.data,
@@ -140,6 +148,8 @@ class AdminService:
                 "page": page,
                 "per_page": per_page
             }
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error fetching users: {e}")
             return {"data": [], "total": 0, "page": page, "per_page": per_page}
@@ -147,8 +157,11 @@ class AdminService:
     async def update_user_role(self, user_id: str, role: str) -> bool:
         """Update user role (e.g. to 'banned' or 'admin')."""
         try:
-            self.supabase.table("profiles").update({"role": role}).eq("id", user_id).execute()
+            await execute(self.supabase.table("profiles").update({"role": role}).eq("id", user_id))
+            user_service.invalidate_profile(user_id)
             return True
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error updating user role: {e}")
             return False
@@ -156,8 +169,11 @@ class AdminService:
     async def update_user_plan(self, user_id: str, plan: str) -> bool:
         """Update user plan."""
         try:
-            self.supabase.table("profiles").update({"plan": plan}).eq("id", user_id).execute()
+            await execute(self.supabase.table("profiles").update({"plan": plan}).eq("id", user_id))
+            user_service.invalidate_profile(user_id)
             return True
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"Error updating user plan: {e}")
             return False
@@ -205,7 +221,7 @@ class AdminService:
 
         try:
             # Fetch all user emails from profiles
-            res = self.supabase.table("profiles").select("email").execute()
+            res = await execute(self.supabase.table("profiles").select("email"))
             emails = [row.get("email") for row in res.data if row.get("email")]
             
             if not emails:
@@ -11,7 +11,10 @@ import google.generativeai as genai
 
 from PIL import Image
 import io
+from app.core.circuit_breaker import CircuitBreaker, gemini_breaker
 from app.core.config import get_settings
+from app.core.deadline import with_deadline
+from app.core.rate_limit import RateLimitExceeded, get_rate_limiter
 from app.core.supabase import get_supabase
 
 settings = get_settings()
@@ -28,6 +31,20 @@ class AIService:
         if self.gemini_key:
             genai.configure(api_key=self.gemini_key)
     
+    async def _gemini_budget(self, api_key: str, breaker: CircuitBreaker) -> bool:
+        """
+        Take a Gemini rate-limit slot once the breaker has let the call through.
+        False (skip Gemini) when the key's budget is spent; the breaker's
+        probe slot is freed, as a local rejection says nothing about Gemini.
+        """
+        try:
+            await get_rate_limiter("gemini").acquire(api_key)
+            return True
+        except RateLimitExceeded as e:
+            breaker.release()
+            print(f"Skipping Gemini: {e}")
+            return False
+    
     async def generate_instagram_caption(
         self, 
         image_bytes_list: List[bytes], 
@@ -120,7 +137,18 @@ class AIService:
                 "max_output_tokens": 1024,
             }
 
+            breaker = gemini_breaker(self.gemini_key)
+            if not breaker.allow():
+                print("DEBUG: Gemini circuit open. Returning fallback caption.")
+                return self._generate_post_fallback(niche, tone, goal, cta)
+
             for model_name in candidate_models:
+                try:
+                    await get_rate_limiter("gemini").acquire(self.gemini_key)
+                except RateLimitExceeded as e:
+                    print(f"DEBUG: {e}")
+                    last_error = e
+                    break
                 try:
                     print(f"DEBUG: Attempting model {model_name}")
                     model = genai.GenerativeModel(model_name, generation_config=generation_config)
@@ -129,7 +157,7 @@ class AIService:
                     if not images:
                         raise Exception("No images provided to AI Service")
                         
-                    response = await model.generate_content_async([prompt, *images])
+                    response = await with_deadline(model.generate_content_async([prompt, *images]))
                     if response and response.text:
                         print(f"DEBUG: Successfully got response from {model_name}")
                         break 
@@ -140,7 +168,9 @@ class AIService:
             
             if not response:
                 print(f"CRITICAL: All models failed. Returning fallback caption.")
+                breaker.record_failure(last_error)
                 return self._generate_post_fallback(niche, tone, goal, cta)
+            breaker.record_success()
             
             # Parse JSON safely
             try:
@@ -276,19 +306,33 @@ class AIService:
                 "max_output_tokens": 512,
             }
 
+            breaker = gemini_breaker(self.gemini_key)
+            if not breaker.allow():
+                return self._generate_persona_fallback(channel_data)
+
             response = None
+            last_error = None
             for model_name in candidate_models:
+                try:
+                    await get_rate_limiter("gemini").acquire(self.gemini_key)
+                except RateLimitExceeded as e:
+                    print(f"Skipping persona generation: {e}")
+                    last_error = e
+                    break
                 try:
                     model = genai.GenerativeModel(model_name, generation_config=generation_config)
-                    response = model.generate_content(prompt)
+                    response = await with_deadline(model.generate_content_async(prompt))
                     if response and response.text:
                         break
                 except Exception as e:
                     print(f"Model {model_name} failed for persona: {e}")
+                    last_error = e
                     continue
             
             if not response:
+                breaker.record_failure(last_error)
                 return self._generate_persona_fallback(channel_data)
+            breaker.record_success()
             
             # Parse JSON
             import re
@@ -336,7 +380,7 @@ class AIService:
         if self.openai_key:
             try:
                 client = openai.AsyncOpenAI(api_key=self.openai_key)
-                response = await client.chat.completions.create(
+                response = await with_deadline(client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=[
                         {
@@ -352,7 +396,7 @@ class AIService:
                         }
                     ],
                     max_tokens=300
-                )
+                ))
                 return response.choices[0].message.content
             except Exception as e:
                 print(f"OpenAI query failed: {e}")
@@ -360,18 +404,21 @@ class AIService:
         
         # Try Gemini SECONDARY key for chatbot (dedicated quota)
         gemini_key_for_chat = self.gemini_key_secondary or self.gemini_key
-        if gemini_key_for_chat:
+        breaker = gemini_breaker(gemini_key_for_chat)
+        if gemini_key_for_chat and breaker.allow() and await self._gemini_budget(gemini_key_for_chat, breaker):
             try:
                 # Temporarily configure with secondary key
                 genai.configure(api_key=gemini_key_for_chat)
                 model = genai.GenerativeModel('models/gemini-flash-latest')
-                response = await model.generate_content_async(f"Context:\n{context_str}\n\nQuestion: {question}")
+                response = await with_deadline(model.generate_content_async(f"Context:\n{context_str}\n\nQuestion: {question}"))
+                breaker.record_success()
                 # Restore primary key configuration
                 if self.gemini_key:
                     genai.configure(api_key=self.gemini_key)
                 return response.text
             except Exception as e:
                 print(f"Gemini query failed: {e}")
+                breaker.record_failure(e)
                 # Restore primary key even on error
                 if self.gemini_key:
                     genai.configure(api_key=self.gemini_key)
@@ -524,24 +571,27 @@ class AIService:
         response_text = ""
         
         # Try Gemini first
-        if self.gemini_key:
+        breaker = gemini_breaker(self.gemini_key)
+        if self.gemini_key and breaker.allow() and await self._gemini_budget(self.gemini_key, breaker):
             try:
                 model = genai.GenerativeModel('gemini-1.5-flash')
-                response = await model.generate_content_async(prompt)
+                response = await with_deadline(model.generate_content_async(prompt))
+                breaker.record_success()
                 response_text = response.text
             except Exception as e:
                 print(f"Gemini report generation failed: {e}")
+                breaker.record_failure(e)
                 
         # Fallback to OpenAI
         if not response_text and self.openai_key:
             try:
                 client = openai.AsyncOpenAI(api_key=self.openai_key)
-                response = await client.chat.completions.create(
+                response = await with_deadline(client.chat.completions.create(
                     model="gpt-4o",
                     messages=[{"role": "user", "content": prompt}],
                     max_tokens=1000,
                     response_format={"type": "json_object"}
-                )
+                ))
                 response_text = response.choices[0].message.content
             except Exception as e:
                 print(f"OpenAI report generation failed: {e}")
@@ -7,7 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from app.core.supabase import get_supabase
+from app.core.config import get_settings
+from app.core.supabase import execute, execute_paged, flatten_embedded, get_supabase
 from app.services.mock_data import (
     get_mock_analytics_overview,
     get_mock_platform_metrics,
@@ -15,6 +16,80 @@ from app.services.mock_data import (
     get_mock_best_times
 )
 
+settings = get_settings()
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+async def get_metrics_summary(
+    user_id: str,
+    days: int = 30,
+    platform: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Aggregated metrics for a user's posts over the last `days` days.
+    Totals, average engagement and growth are computed in Postgres by the
+    analytics_summary RPC (migration 003), so a single row comes back.
+    """
+    since_date = (datetime.now() - timedelta(days=days)).isoformat()
+    response = await execute(get_supabase().rpc("analytics_summary", {
+        "p_user_id": user_id,
+        "p_since": since_date,
+        "p_platform": platform,
+    }))
+    return response.data[0] if response.data else None
+
+
+async def get_rollup_summary(
+    user_id: str,
+    days: int = 30,
+    platform: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Same shape as get_metrics_summary, read from daily_metrics_rollup
+    (migration 007): one row per platform/content type/day in the window.
+    """
+    since_day = (datetime.utcnow() - timedelta(days=days)).date().isoformat()
+    query = get_supabase().table("daily_metrics_rollup").select(
+        "day, metric_rows, likes, comments, shares, reach, impressions, engagement_rate_sum"
+    ).eq("user_id", user_id).gte("day", since_day)
+    if platform:
+        query = query.eq("platform", platform)
+    
+    response = await execute(query)
+    if not response.data:
+        return None
+    
+    df = pd.DataFrame(response.data)
+    df["engagement_rate_sum"] = df["engagement_rate_sum"].astype(float)
+    metric_rows = int(df["metric_rows"].sum())
+    if not metric_rows:
+        return None
+    
+    # Growth: newer half of the window vs older half, split at the median snapshot's day
+    by_day = df.groupby("day")[["metric_rows", "engagement_rate_sum"]].sum().sort_index()
+    mid_day = by_day.index[(by_day["metric_rows"].cumsum() >= metric_rows / 2).argmax()]
+    recent = by_day[by_day.index >= mid_day].sum()
+    older = by_day[by_day.index < mid_day].sum()
+    
+    growth_rate = None
+    if metric_rows >= 2 and older["metric_rows"] and recent["metric_rows"]:
+        older_rate = older["engagement_rate_sum"] / older["metric_rows"]
+        recent_rate = recent["engagement_rate_sum"] / recent["metric_rows"]
+        if older_rate > 0:
+            growth_rate = round((recent_rate - older_rate) / older_rate * 100, 2)
+    
+    return {
+        "metric_rows": metric_rows,
+        "total_likes": int(df["likes"].sum()),
+        "total_comments": int(df["comments"].sum()),
+        "total_shares": int(df["shares"].sum()),
+        "total_reach": int(df["reach"].sum()),
+        "total_impressions": int(df["impressions"].sum()),
+        "avg_engagement_rate": round(df["engagement_rate_sum"].sum() / metric_rows, 2),
+        "growth_rate": growth_rate,
+    }
+
 
 class AnalyticsEngine:
     """Engine for calculating unified analytics across platforms."""
@@ -26,26 +101,25 @@ class AnalyticsEngine:
     async def get_overview(self, days: int = 30) -> Dict[str, Any]:
         """Get analytics overview for all platforms."""
         try:
-            since_date = (datetime.now() - timedelta(days=days)).isoformat()
-            
-            # Fetch metrics
-            response = self.supabase.table("metrics").select(
-                "likes, comments, shares, reach, impressions, engagement_rate, collected_at"
-            ).gte("collected_at", since_date).execute()
+            if settings.analytics_use_rollups:
+                summary = await get_rollup_summary(self.user_id, days)
+            else:
+                summary = await get_metrics_summary(self.user_id, days)
             
-            if not response.data:
+            if not summary or not summary["metric_rows"]:
                 return get_mock_analytics_overview(self.user_id)
             
-            df = pd.DataFrame(response.data)
+            # No baseline (single period, or zero older engagement): report no growth
+            growth_rate = summary.get("growth_rate")
             
             return {
-                "total_impressions": int(df["impressions"].sum()),
-                "engagement_rate": round(df["engagement_rate"].mean(), 2),
-                "total_comments": int(df["comments"].sum()),
-                "total_shares": int(df["shares"].sum()),
-                "total_likes": int(df["likes"].sum()),
-                "total_reach": int(df["reach"].sum()),
-                "growth_rate": self._calculate_growth(df),
+                "total_impressions": int(summary["total_impressions"]),
+                "engagement_rate": float(summary["avg_engagement_rate"] or 0),
+                "total_comments": int(summary["total_comments"]),
+                "total_shares": int(summary["total_shares"]),
+                "total_likes": int(summary["total_likes"]),
+                "total_reach": int(summary["total_reach"]),
+                "growth_rate": float(growth_rate) if growth_rate is not None else 0.0,
             }
             
         except Exception as e:
@@ -55,9 +129,9 @@ class AnalyticsEngine:
         """Get metrics breakdown by platform."""
         try:
             # Get posts grouped by platform
-            response = self.supabase.table("posts").select(
+            response = await execute(self.supabase.table("posts").select(
                 "platform"
-            ).eq("user_id", self.user_id).execute()
+            ).eq("user_id", self.user_id))
             
             if not response.data:
                 return [get_mock_platform_metrics(p) for p in ["instagram", "youtube", "twitter", "linkedin"]]
@@ -76,30 +150,20 @@ class AnalyticsEngine:
     
     async def compare_content_types(self) -> Dict[str, Any]:
         """Compare performance across content types."""
+        if settings.analytics_use_rollups:
+            return await self._compare_content_types_from_rollups()
+        
         try:
-            # Get posts with metrics
-            posts = self.supabase.table("posts").select(
-                "id, content_type, platform"
-            ).eq("user_id", self.user_id).execute()
-            
-            if not posts.data:
-                return self._mock_content_comparison()
-            
-            post_ids = [p["id"] for p in posts.data]
+            # Metrics joined with their posts, paged past PostgREST's max-rows
+            rows = await execute_paged(lambda: self.supabase.table("metrics").select(
+                "post_id, likes, comments, shares, reach, engagement_rate, "
+                "posts!inner(content_type, platform)"
+            ).eq("user_id", self.user_id).order("id"))
             
-            metrics = self.supabase.table("metrics").select(
-                "post_id, likes, comments, shares, reach, engagement_rate"
-            ).in_("post_id", post_ids).execute()
-            
-            if not metrics.data:
+            if not rows:
                 return self._mock_content_comparison()
             
-            # Create DataFrames
-            posts_df = pd.DataFrame(posts.data)
-            metrics_df = pd.DataFrame(metrics.data)
-            
-            # Merge
-            merged = posts_df.merge(metrics_df, left_on="id", right_on="post_id")
+            merged = pd.DataFrame(flatten_embedded(rows, "posts"))
             
             # Group by content type
             by_type = merged.groupby("content_type").agg({
@@ -123,29 +187,20 @@ class AnalyticsEngine:
     
     async def get_time_analysis(self) -> Dict[str, Any]:
         """Analyze best posting times based on engagement."""
+        if settings.analytics_use_rollups:
+            return await self._get_time_analysis_from_rollups()
+        
         try:
-            posts = self.supabase.table("posts").select(
-                "id, posted_at, platform"
-            ).eq("user_id", self.user_id).execute()
+            rows = await execute_paged(lambda: self.supabase.table("metrics").select(
+                "post_id, engagement_rate, posts!inner(posted_at, platform)"
+            ).eq("user_id", self.user_id).order("id"))
             
-            if not posts.data:
-                return get_mock_best_times()
-            
-            # Process posting times
-            df = pd.DataFrame(posts.data)
-            df["posted_at"] = pd.to_datetime(df["posted_at"])
-            df["hour"] = df["posted_at"].dt.hour
-            df["day_of_week"] = df["posted_at"].dt.day_name()
-            
-            # Get metrics
-            post_ids = [p["id"] for p in posts.data]
-            metrics = self.supabase.table("metrics").select(
-                "post_id, engagement_rate"
-            ).in_("post_id", post_ids).execute()
-            
-            if metrics.data:
-                metrics_df = pd.DataFrame(metrics.data)
-                merged = df.merge(metrics_df, left_on="id", right_on="post_id")
+            if rows:
+                # Process posting times
+                merged = pd.DataFrame(flatten_embedded(rows, "posts"))
+                merged["posted_at"] = pd.to_datetime(merged["posted_at"])
+                merged["hour"] = merged["posted_at"].dt.hour
+                merged["day_of_week"] = merged["posted_at"].dt.day_name()
                 
                 # Best hours
                 best_hours = merged.groupby("hour")["engagement_rate"].mean().nlargest(3).index.tolist()
@@ -162,20 +217,72 @@ class AnalyticsEngine:
         except Exception:
             return get_mock_best_times()
     
-    def _calculate_growth(self, df: pd.DataFrame) -> float:
-        """Calculate growth rate comparing recent vs older data."""
-        if len(df) < 2:
-            return 12.5  # Default
-        
-        df["collected_at"] = pd.to_datetime(df["collected_at"])
-        mid_point = df["collected_at"].median()
-        
-        recent = df[df["collected_at"] >= mid_point]["engagement_rate"].mean()
-        older = df[df["collected_at"] < mid_point]["engagement_rate"].mean()
-        
-        if older > 0:
-            return round(((recent - older) / older) * 100, 2)
-        return 12.5
+    async def _compare_content_types_from_rollups(self) -> Dict[str, Any]:
+        """compare_content_types over daily_metrics_rollup."""
+        try:
+            rollups = await execute(self.supabase.table("daily_metrics_rollup").select(
+                "content_type, metric_rows, likes, comments, shares, engagement_rate_sum"
+            ).eq("user_id", self.user_id).neq("content_type", "unknown"))
+            
+            if not rollups.data:
+                return self._mock_content_comparison()
+            
+            df = pd.DataFrame(rollups.data)
+            df["engagement_rate_sum"] = df["engagement_rate_sum"].astype(float)
+            totals = df.groupby("content_type").sum(numeric_only=True)
+            totals = totals[totals["metric_rows"] > 0]
+            
+            # Per-snapshot means, as in the raw-metrics path
+            by_type = pd.DataFrame({
+                "likes": totals["likes"] / totals["metric_rows"],
+                "comments": totals["comments"] / totals["metric_rows"],
+                "shares": totals["shares"] / totals["metric_rows"],
+                "engagement_rate": totals["engagement_rate_sum"] / totals["metric_rows"],
+            }).round(2).to_dict("index")
+            
+            best_type = max(by_type.items(), key=lambda x: x[1]["engagement_rate"])[0] if by_type else "reel"
+            
+            return {
+                "by_content_type": by_type,
+                "best_type": best_type,
+                "recommendation": f"{best_type.title()}s perform best with your audience!"
+            }
+            
+        except Exception:
+            return self._mock_content_comparison()
+    
+    async def _get_time_analysis_from_rollups(self) -> Dict[str, Any]:
+        """get_time_analysis over posting_hour_rollup."""
+        try:
+            rollups = await execute(self.supabase.table("posting_hour_rollup").select(
+                "posted_dow, posted_hour, metric_rows, engagement_rate_sum"
+            ).eq("user_id", self.user_id))
+            
+            if not rollups.data:
+                return get_mock_best_times()
+            
+            df = pd.DataFrame(rollups.data)
+            df["engagement_rate_sum"] = df["engagement_rate_sum"].astype(float)
+            
+            def best(column: str) -> List[int]:
+                totals = df.groupby(column)[["metric_rows", "engagement_rate_sum"]].sum()
+                totals = totals[totals["metric_rows"] > 0]
+                return (totals["engagement_rate_sum"] / totals["metric_rows"]).nlargest(3).index.tolist()
+            
+            best_hours = best("posted_hour")
+            best_days = [DAY_NAMES[d] for d in best("posted_dow")]
+            
+            if not best_hours or not best_days:
+                return get_mock_best_times()
+            
+            return {
+                "best_hours": [f"{h}:00" for h in best_hours],
+                "best_days": best_days,
+                "recommendation": f"Post at {best_hours[0]}:00 on {best_days[0]} for best engagement"
+            }
+            
+        except Exception:
+            return get_mock_best_times()
     
     def _mock_content_comparison(self) -> Dict[str, Any]:
         """Return mock content comparison data."""
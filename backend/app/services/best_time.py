@@ -7,7 +7,7 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-from app.core.supabase import get_supabase
+from app.core.supabase import execute_paged, flatten_embedded, get_supabase
 
 
 class BestTimeEngine:
@@ -22,36 +22,24 @@ class BestTimeEngine:
         Analyze posting times and return optimal scheduling recommendations.
         """
         try:
-            # Try to get real data
-            query = self.supabase.table("posts").select(
-                "id, platform, content_type, posted_at"
-            ).eq("user_id", self.user_id)
+            # Try to get real data: metrics joined with their posts, paged past PostgREST's max-rows
+            def build_query():
+                query = self.supabase.table("metrics").select(
+                    "post_id, engagement_rate, posts!inner(platform, content_type, posted_at)"
+                ).eq("user_id", self.user_id)
+                
+                if platform:
+                    query = query.eq("posts.platform", platform)
+                if content_type:
+                    query = query.eq("posts.content_type", content_type)
+                return query.order("id")
             
-            if platform:
-                query = query.eq("platform", platform)
-            if content_type:
-                query = query.eq("content_type", content_type)
+            rows = await execute_paged(build_query)
             
-            posts = query.execute()
-            
-            if not posts.data or len(posts.data) < 5:
+            if not rows or len({m["post_id"] for m in rows}) < 5:
                 return self._get_default_recommendations(platform, content_type)
             
-            # Get metrics for these posts
-            post_ids = [p["id"] for p in posts.data]
-            metrics = self.supabase.table("metrics").select(
-                "post_id, engagement_rate"
-            ).in_("post_id", post_ids).execute()
-            
-            if not metrics.data:
-                return self._get_default_recommendations(platform, content_type)
-            
-            # Create DataFrames
-            posts_df = pd.DataFrame(posts.data)
-            metrics_df = pd.DataFrame(metrics.data)
-            
-            # Merge
-            df = posts_df.merge(metrics_df, left_on="id", right_on="post_id")
+            df = pd.DataFrame(flatten_embedded(rows, "posts"))
             df["posted_at"] = pd.to_datetime(df["posted_at"])
             df["hour"] = df["posted_at"].dt.hour
             df["day_of_week"] = df["posted_at"].dt.dayofweek
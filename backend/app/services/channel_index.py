@@ -0,0 +1,99 @@
+"""
+Persistent handle -> YouTube channel ID index.
+
+Resolving a handle costs a channels.list call and a search term costs a
+search.list call (100 quota units). Resolutions are kept in a small JSON
+file so repeat lookups, including across restarts, need no round-trip.
+Misses are cached too, for a shorter TTL.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class ChannelIndex:
+    """Query -> channel ID map with TTLs, persisted to a JSON file."""
+
+    def __init__(self, path: str, ttl: float, negative_ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._save_lock = asyncio.Lock()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Handles and search terms are matched case-insensitively."""
+        return query.strip().lower()
+
+    def lookup(self, query: str) -> Tuple[bool, Optional[str]]:
+        """
+        Return (found, channel_id).
+        found is True for fresh hits, including cached misses (channel_id None).
+        """
+        entry = self._entries.get(self.normalize(query))
+        if entry is None:
+            return False, None
+        ttl = self.ttl if entry.get("channel_id") else self.negative_ttl
+        if time.time() - entry.get("resolved_at", 0) >= ttl:
+            return False, None
+        return True, entry.get("channel_id")
+
+    async def remember(self, query: str, channel_id: Optional[str]) -> None:
+        """Record a resolution (None for a confirmed miss) and persist it."""
+        self._entries[self.normalize(query)] = {
+            "channel_id": channel_id,
+            "resolved_at": time.time(),
+        }
+        await self.save()
+
+    async def load(self) -> None:
+        """Warm the index from disk, dropping expired entries."""
+        try:
+            entries = await asyncio.to_thread(self._read)
+        except Exception as e:
+            print(f"[ChannelIndex] Could not load {self.path}: {e}")
+            return
+
+        now = time.time()
+        self._entries = {
+            query: entry for query, entry in entries.items()
+            if now - entry.get("resolved_at", 0)
+            < (self.ttl if entry.get("channel_id") else self.negative_ttl)
+        }
+        print(f"[ChannelIndex] Loaded {len(self._entries)} channel resolutions")
+
+    async def save(self) -> None:
+        async with self._save_lock:
+            snapshot = dict(self._entries)
+            try:
+                await asyncio.to_thread(self._write, snapshot)
+            except Exception as e:
+                print(f"[ChannelIndex] Error saving {self.path}: {e}")
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        # Write to a temp file and swap it in so a crash never leaves a torn index
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+
+# Singleton instance
+channel_index = ChannelIndex(
+    settings.channel_index_path,
+    ttl=settings.channel_index_ttl,
+    negative_ttl=settings.channel_index_negative_ttl,
+)
@@ -9,6 +9,8 @@ import io
 from PIL import Image
 from fastapi import UploadFile
 from app.core.config import get_settings
+from app.core.deadline import with_deadline
+from app.core.rate_limit import get_rate_limiter
 
 settings = get_settings()
 
@@ -117,13 +119,14 @@ OUTPUT FORMAT (JSON ONLY)
 """
             # 3. Call Gemini
             # Use 1.5 Flash for speed/multimodal, or Pro for complex reasoning
+            await get_rate_limiter("gemini").acquire(self.gemini_key)
             model = genai.GenerativeModel('gemini-1.5-flash')
             
             # Combine [Prompt, ...Images/Videos]
             request_content = [prompt] + media_parts
             
             print("🚀 Sending request to Gemini Content Agent...")
-            response = model.generate_content(request_content)
+            response = await with_deadline(model.generate_content_async(request_content))
             
             # 4. Parse Response
             text = response.text.strip()
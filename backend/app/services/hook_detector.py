@@ -8,11 +8,14 @@ import os
 import json
 import re
 import random
-import httpx
 from typing import List, Tuple, Optional
 
 # Use Settings class to properly load environment variables
+from app.core.circuit_breaker import gemini_breaker, get_breaker
 from app.core.config import get_settings
+from app.core.deadline import with_deadline
+from app.core.http import get_http_client
+from app.core.rate_limit import RateLimitExceeded, get_rate_limiter
 
 settings = get_settings()
 
@@ -61,6 +64,19 @@ async def analyze_hook_with_gemini_text(video_duration: float) -> Optional[dict]
         print("DEBUG: GEMINI_API_KEY not configured")
         return None
         
+    breaker = gemini_breaker(GEMINI_API_KEY)
+    if not breaker.allow():
+        print("DEBUG: Gemini circuit open, skipping TEXT analysis")
+        return None
+    
+    # A local rejection is not an upstream failure; just free the probe slot
+    try:
+        await get_rate_limiter("gemini").acquire(GEMINI_API_KEY)
+    except RateLimitExceeded as e:
+        breaker.release()
+        print(f"DEBUG: {e}, skipping TEXT analysis")
+        return None
+    
     print("DEBUG: Using Gemini TEXT model for hook analysis...")
     
     try:
@@ -73,13 +89,14 @@ async def analyze_hook_with_gemini_text(video_duration: float) -> Optional[dict]
         # Add video context to prompt
         prompt = TEXT_HOOK_PROMPT + f"\n\nVideo duration: {video_duration:.1f}s"
         
-        response = await model.generate_content_async(
+        response = await with_deadline(model.generate_content_async(
             prompt,
             generation_config=genai.types.GenerationConfig(
                 temperature=0.7,
                 max_output_tokens=300
             )
-        )
+        ))
+        breaker.record_success()
         
         response_text = ""
         
@@ -110,6 +127,7 @@ async def analyze_hook_with_gemini_text(video_duration: float) -> Optional[dict]
     except Exception as e:
         error_str = str(e)
         print(f"DEBUG: Gemini TEXT failed: {error_str[:100]}")
+        breaker.record_failure(e)
     
     return None
 
@@ -120,6 +138,19 @@ async def analyze_hook_with_hf_text() -> Optional[dict]:
         print("DEBUG: HUGGINGFACE_API_KEY not configured")
         return None
     
+    breaker = get_breaker("huggingface")
+    if not breaker.allow():
+        print("DEBUG: HF circuit open, skipping TEXT analysis")
+        return None
+    
+    # A local rejection is not an upstream failure; just free the probe slot
+    try:
+        await get_rate_limiter("huggingface").acquire(HUGGINGFACE_API_KEY)
+    except RateLimitExceeded as e:
+        breaker.release()
+        print(f"DEBUG: {e}, skipping TEXT analysis")
+        return None
+    
     print("DEBUG: Using HF TEXT model (Mistral) for hook analysis...")
     
     # Use Mistral text model - very stable on free tier
@@ -140,41 +171,47 @@ async def analyze_hook_with_hf_text() -> Optional[dict]:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(api_url, headers=headers, json=payload)
+        client = get_http_client("huggingface")
+        response = await client.post(api_url, headers=headers, json=payload, timeout=30.0)
+        
+        print(f"DEBUG: HF TEXT status: {response.status_code}")
+        # 5xx and 429 (incl. "model is loading" 503s) count against the breaker
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        
+        if response.status_code == 200:
+            data = response.json()
+            result_text = ""
+            
+            if isinstance(data, list) and len(data) > 0:
+                result_text = data[0].get("generated_text", "")
+            elif isinstance(data, dict):
+                result_text = data.get("generated_text", "")
+            
+            print(f"DEBUG: HF TEXT response: {result_text[:100]}...")
             
-            print(f"DEBUG: HF TEXT status: {response.status_code}")
+            # Try to extract JSON
+            json_match = re.search(r'\{[^\}]+\}', result_text)
+            if json_match:
+                try:
+                    result = json.loads(json_match.group())
+                    result.setdefault("frame_index", 1)
+                    result.setdefault("timestamp_sec", 1)
+                    result.setdefault("hook_score", 72)
+                    result.setdefault("reason", "AI analysis completed")
+                    result.setdefault("visual_elements", ["analyzed"])
+                    result.setdefault("improvement_tip", "Add text overlay in first 2 seconds")
+                    return result
+                except:
+                    pass
+        else:
+            print(f"DEBUG: HF TEXT error: {response.text[:100]}")
             
-            if response.status_code == 200:
-                data = response.json()
-                result_text = ""
-                
-                if isinstance(data, list) and len(data) > 0:
-                    result_text = data[0].get("generated_text", "")
-                elif isinstance(data, dict):
-                    result_text = data.get("generated_text", "")
-                
-                print(f"DEBUG: HF TEXT response: {result_text[:100]}...")
-                
-                # Try to extract JSON
-                json_match = re.search(r'\{[^\}]+\}', result_text)
-                if json_match:
-                    try:
-                        result = json.loads(json_match.group())
-                        result.setdefault("frame_index", 1)
-                        result.setdefault("timestamp_sec", 1)
-                        result.setdefault("hook_score", 72)
-                        result.setdefault("reason", "AI analysis completed")
-                        result.setdefault("visual_elements", ["analyzed"])
-                        result.setdefault("improvement_tip", "Add text overlay in first 2 seconds")
-                        return result
-                    except:
-                        pass
-            else:
-                print(f"DEBUG: HF TEXT error: {response.text[:100]}")
-                
     except Exception as e:
         print(f"DEBUG: HF TEXT exception: {str(e)[:100]}")
+        breaker.record_failure(e)
     
     return None
 
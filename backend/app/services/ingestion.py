@@ -0,0 +1,205 @@
+"""
+Ingestion of synced platform data into the posts and metrics tables.
+
+Platform payloads are normalized into one row per post (post fields plus
+the current counters) and written through the ingest_posts RPC (migration
+005): each batch is a single round-trip that upserts the posts on
+UNIQUE(user_id, platform, platform_post_id) and appends a metrics snapshot.
+Each row carries a fingerprint of its counters; posts whose fingerprint
+matches the last snapshot written get no new metrics row (migration 006);
+posts.last_seen_at lets windowed reads carry their latest snapshot forward.
+Every snapshot written is also added to the daily and posting-hour
+rollups (migration 007) in the same statement.
+"""
+from typing import Any, Dict, List, Optional
+
+from app.core.cache import digest
+from app.core.config import get_settings
+from app.core.supabase import execute, get_supabase, get_supabase_admin
+
+settings = get_settings()
+
+# posts.content_type CHECK constraint values
+CONTENT_TYPES = {"image", "video", "reel", "carousel", "story", "short", "post", "thread"}
+
+# Counters that make up a metrics snapshot
+METRIC_FIELDS = ("likes", "comments", "shares", "saves", "reach", "impressions", "views")
+
+INSTAGRAM_CONTENT_TYPES = {
+    "IMAGE": "image",
+    "VIDEO": "video",
+    "REELS": "reel",
+    "CAROUSEL_ALBUM": "carousel",
+}
+
+
+def _int(value: Any) -> int:
+    """Counters arrive as ints or strings (YouTube) and may be missing."""
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _engagement_rate(interactions: int, base: int) -> float:
+    # metrics.engagement_rate is DECIMAL(5, 2)
+    if base <= 0:
+        return 0.0
+    return round(min(interactions / base * 100, 999.99), 2)
+
+
+def metrics_fingerprint(row: Dict[str, Any]) -> str:
+    """Compact digest of a row's counters, compared against the last snapshot written."""
+    return digest(",".join(str(_int(row.get(field))) for field in METRIC_FIELDS))[:16]
+
+
+def normalize_youtube_videos(
+    videos: List[Dict[str, Any]],
+    stats: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """playlistItems (snippet) + videos (statistics) -> ingest rows."""
+    snippets = {
+        v["snippet"]["resourceId"]["videoId"]: v["snippet"]
+        for v in videos if "resourceId" in v.get("snippet", {})
+    }
+    
+    rows = []
+    for item in stats:
+        video_id = item.get("id")
+        if not video_id:
+            continue
+        snippet = item.get("snippet") or snippets.get(video_id, {})
+        statistics = item.get("statistics", {})
+        thumbnails = snippet.get("thumbnails", {})
+        
+        views = _int(statistics.get("viewCount"))
+        likes = _int(statistics.get("likeCount"))
+        comments = _int(statistics.get("commentCount"))
+        
+        rows.append({
+            "platform_post_id": video_id,
+            "content_type": "video",
+            "title": snippet.get("title"),
+            "description": snippet.get("description"),
+            "media_url": (thumbnails.get("high") or thumbnails.get("default") or {}).get("url"),
+            "permalink": f"https://www.youtube.com/watch?v={video_id}",
+            "posted_at": snippet.get("publishedAt"),
+            "likes": likes,
+            "comments": comments,
+            "views": views,
+            "impressions": views,
+            "engagement_rate": _engagement_rate(likes + comments, views),
+        })
+    return rows
+
+
+def normalize_instagram_media(media: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Graph API media (with flattened insights) -> ingest rows."""
+    rows = []
+    for post in media:
+        if not post.get("id"):
+            continue
+        insights = post.get("insights") or {}
+        
+        likes = _int(post.get("like_count"))
+        comments = _int(post.get("comments_count"))
+        saves = _int(insights.get("saved"))
+        reach = _int(insights.get("reach"))
+        
+        rows.append({
+            "platform_post_id": post["id"],
+            "content_type": INSTAGRAM_CONTENT_TYPES.get(post.get("media_type"), "post"),
+            "description": post.get("caption"),
+            "media_url": post.get("media_url"),
+            "permalink": post.get("permalink"),
+            "posted_at": post.get("timestamp"),
+            "likes": likes,
+            "comments": comments,
+            "saves": saves,
+            "reach": reach,
+            "impressions": _int(insights.get("impressions")),
+            "engagement_rate": _engagement_rate(likes + comments + saves, reach),
+        })
+    return rows
+
+
+def normalize_tweets(tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Parsed tweets (get_recent_tweets / refresh_tweet_metrics) -> ingest rows."""
+    rows = []
+    for tweet in tweets:
+        if not tweet.get("id"):
+            continue
+        
+        likes = _int(tweet.get("likes"))
+        replies = _int(tweet.get("replies"))
+        retweets = _int(tweet.get("retweets"))
+        impressions = _int(tweet.get("impressions"))
+        
+        rows.append({
+            "platform_post_id": tweet["id"],
+            "content_type": "post",
+            "description": tweet.get("text"),
+            "permalink": f"https://twitter.com/i/web/status/{tweet['id']}",
+            "posted_at": tweet.get("created_at"),
+            "likes": likes,
+            "comments": replies,
+            "shares": retweets,
+            "impressions": impressions,
+            "engagement_rate": _engagement_rate(likes + replies + retweets, impressions),
+        })
+    return rows
+
+
+async def ingest_posts(
+    user_id: str,
+    platform: str,
+    rows: List[Dict[str, Any]],
+    batch_size: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Upsert normalized rows in batches of `batch_size` (one round-trip each).
+    Returns how many posts were inserted and updated and how many metrics
+    snapshots were written or skipped as unchanged.
+    """
+    batch_size = batch_size or settings.ingest_batch_size
+    
+    # Writes go through the service role: scheduled syncs have no user session for RLS
+    supabase = get_supabase_admin() or get_supabase()
+    
+    # A post may only appear once per upsert statement; keep the latest payload
+    unique = {}
+    for row in rows:
+        if row.get("content_type") not in CONTENT_TYPES:
+            row["content_type"] = "post"
+        row["metrics_fingerprint"] = metrics_fingerprint(row)
+        unique[row["platform_post_id"]] = row
+    rows = list(unique.values())
+    
+    result = {
+        "posts_inserted": 0,
+        "posts_updated": 0,
+        "metrics_written": 0,
+        "metrics_skipped": 0,
+        "batches_failed": 0,
+    }
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            response = await execute(supabase.rpc("ingest_posts", {
+                "p_user_id": user_id,
+                "p_platform": platform,
+                "p_rows": batch,
+            }))
+        except Exception as e:
+            print(f"[Ingestion] {platform} batch of {len(batch)} failed for {user_id[:8]}: {e}")
+            result["batches_failed"] += 1
+            continue
+        
+        counts = response.data[0] if response.data else {}
+        result["posts_inserted"] += counts.get("inserted", 0)
+        result["posts_updated"] += counts.get("updated", 0)
+        result["metrics_written"] += counts.get("metrics_written", 0)
+        result["metrics_skipped"] += counts.get("metrics_skipped", 0)
+    
+    print(f"[Ingestion] {platform} for {user_id[:8]}: {result}")
+    return result
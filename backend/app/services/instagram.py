@@ -5,74 +5,210 @@ For demo, it uses mock data. Replace with real API calls when credentials are av
 
 Note: Instagram Graph API requires a Facebook Business account and approved app.
 """
+import asyncio
+import json
 import httpx
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from app.core.config import get_settings
+from app.core.http import get_http_client
+from app.core.rate_limit import RateLimitExceeded
+from app.services.ingestion import ingest_posts, normalize_instagram_media
+from app.services.instagram_service import graph_request
 
 settings = get_settings()
 
 INSTAGRAM_API_BASE = "https://graph.instagram.com"
 FACEBOOK_GRAPH_API = "https://graph.facebook.com/v18.0"
 
+MEDIA_FIELDS = "id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count"
+MEDIA_INSIGHT_METRICS = "engagement,impressions,reach,saved"
+GRAPH_BATCH_MAX = 50  # Max requests per Graph API batch call
+
 
 class InstagramService:
     """Service for interacting with Instagram Graph API."""
     
-    def __init__(self, access_token: Optional[str] = None):
+    def __init__(self, access_token: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         self.access_token = access_token
+        self._http_client = http_client
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Injected client, or the shared pooled Instagram client."""
+        return self._http_client or get_http_client("instagram")
+    
+    async def _request(self, method: str, url: str, cost: int = 1, **kwargs) -> httpx.Response:
+        """Graph API call through graph_request, budgeted against this service's token."""
+        return await graph_request(method, url, self.access_token, cost, client=self.http, **kwargs)
+    
+    async def _get(self, url: str, params: Dict[str, Any]) -> httpx.Response:
+        return await self._request("GET", url, params=params)
     
     async def get_user_info(self) -> Dict[str, Any]:
         """Get Instagram user/account information."""
         if not self.access_token:
             return self._mock_user_info()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{INSTAGRAM_API_BASE}/me",
-                params={
-                    "fields": "id,username,account_type,media_count,followers_count,follows_count",
-                    "access_token": self.access_token
-                }
-            )
-            if response.status_code == 200:
-                return response.json()
-            return self._mock_user_info()
+        response = await self._get(
+            f"{INSTAGRAM_API_BASE}/me",
+            params={
+                "fields": "id,username,account_type,media_count,followers_count,follows_count",
+                "access_token": self.access_token
+            }
+        )
+        if response.status_code == 200:
+            return response.json()
+        return self._mock_user_info()
     
     async def get_media(self, limit: int = 25) -> List[Dict[str, Any]]:
         """Get recent media posts."""
         if not self.access_token:
             return self._mock_media(limit)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{INSTAGRAM_API_BASE}/me/media",
-                params={
-                    "fields": "id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count",
-                    "limit": limit,
-                    "access_token": self.access_token
-                }
-            )
-            if response.status_code == 200:
-                return response.json().get("data", [])
-            return self._mock_media(limit)
+        response = await self._get(
+            f"{INSTAGRAM_API_BASE}/me/media",
+            params={
+                "fields": "id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count",
+                "limit": limit,
+                "access_token": self.access_token
+            }
+        )
+        if response.status_code == 200:
+            return response.json().get("data", [])
+        return self._mock_media(limit)
+    
+    async def get_media_with_insights(self, max_posts: int = 100, page_size: int = 25) -> List[Dict[str, Any]]:
+        """
+        Get media with per-post insights, following paging cursors.
+        
+        Insights are embedded with field expansion, so each page of media and
+        its insights is one call. Posts whose insights can't be expanded
+        (e.g. published before the account became a business account, which
+        fails the whole expanded page) are filled in through batch requests.
+        Each post gets an `insights` dict of metric -> value, or None.
+        """
+        if not self.access_token:
+            media = self._mock_media(max_posts)
+            for post in media:
+                post["insights"] = self._flatten_insights(self._mock_media_insights())
+            return media
+        
+        media: List[Dict[str, Any]] = []
+        expand = True
+        url: Optional[str] = f"{INSTAGRAM_API_BASE}/me/media"
+        params: Dict[str, Any] = {
+            "fields": f"{MEDIA_FIELDS},insights.metric({MEDIA_INSIGHT_METRICS})",
+            "limit": page_size,
+            "access_token": self.access_token,
+        }
+        
+        while url and len(media) < max_posts:
+            response = await self._get(url, params)
+            if response.status_code != 200:
+                if expand and response.status_code == 400:
+                    # Retry this page without the expansion; insights come from the batch path
+                    expand = False
+                    params["fields"] = MEDIA_FIELDS
+                    continue
+                break
+            
+            data = response.json()
+            for post in data.get("data", []):
+                insights = post.pop("insights", None)
+                post["insights"] = self._flatten_insights(insights) if insights else None
+                media.append(post)
+            
+            # The next-page URL carries the cursor along with fields, limit and token
+            next_url = data.get("paging", {}).get("next")
+            url = None
+            if next_url:
+                parsed = httpx.URL(next_url)
+                url = str(parsed.copy_with(query=None))
+                params = dict(parsed.params)
+        
+        media = media[:max_posts]
+        missing = [post["id"] for post in media if post["insights"] is None]
+        if missing:
+            batched = await self.get_media_insights_batch(missing)
+            for post in media:
+                if post["insights"] is None:
+                    post["insights"] = batched.get(post["id"])
+        
+        return media
+    
+    async def get_media_insights_batch(self, media_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get insights for many posts via Graph API batch requests (50 per call),
+        with a bounded number of batches in flight. Batches go to the same
+        host as the media listing, which issued the token and media IDs.
+        Posts whose insights are unavailable are left out.
+        """
+        if not self.access_token or not media_ids:
+            return {}
+        
+        semaphore = asyncio.Semaphore(settings.instagram_batch_concurrency)
+        
+        async def run_batch(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+            batch = [
+                {"method": "GET", "relative_url": f"{media_id}/insights?metric={MEDIA_INSIGHT_METRICS}"}
+                for media_id in ids
+            ]
+            async with semaphore:
+                # Graph API counts every request inside a batch against the rate limit
+                response = await self._request(
+                    "POST",
+                    INSTAGRAM_API_BASE,
+                    cost=len(ids),
+                    data={"access_token": self.access_token, "batch": json.dumps(batch)},
+                )
+            if response.status_code != 200:
+                return {}
+            
+            results = {}
+            for media_id, item in zip(ids, response.json() or []):
+                if not item or item.get("code") != 200:
+                    continue
+                try:
+                    results[media_id] = self._flatten_insights(json.loads(item.get("body") or "{}"))
+                except ValueError:
+                    continue
+            return results
+        
+        chunks = [media_ids[i:i + GRAPH_BATCH_MAX] for i in range(0, len(media_ids), GRAPH_BATCH_MAX)]
+        insights: Dict[str, Dict[str, Any]] = {}
+        for result in await asyncio.gather(*(run_batch(chunk) for chunk in chunks)):
+            insights.update(result)
+        return insights
+    
+    @staticmethod
+    def _flatten_insights(insights: Dict[str, Any]) -> Dict[str, Any]:
+        """{"data": [{"name": ..., "values": [{"value": ...}]}]} -> {name: value}."""
+        return {
+            metric["name"]: metric["values"][0]["value"] if metric.get("values") else 0
+            for metric in insights.get("data", [])
+        }
     
     async def get_media_insights(self, media_id: str) -> Dict[str, Any]:
-        """Get insights for a specific media post."""
+        """
+        Get insights for a specific media post.
+        Raises RateLimitExceeded when the token's budget is spent.
+        """
         if not self.access_token:
             return self._mock_media_insights()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{INSTAGRAM_API_BASE}/{media_id}/insights",
-                params={
-                    "metric": "engagement,impressions,reach,saved",
-                    "access_token": self.access_token
-                }
-            )
-            if response.status_code == 200:
-                return response.json()
-            return self._mock_media_insights()
+        response = await self._get(
+            f"{INSTAGRAM_API_BASE}/{media_id}/insights",
+            params={
+                "metric": "engagement,impressions,reach,saved",
+                "access_token": self.access_token
+            }
+        )
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 429:
+            raise RateLimitExceeded("instagram", "media insights budget exhausted")
+        return self._mock_media_insights()
     
     async def get_account_insights(self, period: str = "day", since: Optional[datetime] = None) -> Dict[str, Any]:
         """Get account-level insights."""
@@ -88,14 +224,13 @@ class InstagramService:
         if since:
             params["since"] = int(since.timestamp())
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{INSTAGRAM_API_BASE}/me/insights",
-                params=params
-            )
-            if response.status_code == 200:
-                return response.json()
-            return self._mock_account_insights()
+        response = await self._get(
+            f"{INSTAGRAM_API_BASE}/me/insights",
+            params=params
+        )
+        if response.status_code == 200:
+            return response.json()
+        return self._mock_account_insights()
     
     def _mock_user_info(self) -> Dict[str, Any]:
         """Return mock user info."""
@@ -183,18 +318,20 @@ async def sync_instagram_data(user_id: str, access_token: str) -> Dict[str, Any]
     # Get user info
     user_info = await service.get_user_info()
     
-    # Get media posts
-    media = await service.get_media(limit=25)
+    # Get media posts with their insights (field expansion, batch fallback)
+    media = await service.get_media_with_insights(max_posts=settings.instagram_sync_max_posts)
+    insights_count = sum(1 for post in media if post.get("insights") is not None)
     
-    # Get insights for each post (in production, batch this)
-    insights_count = 0
-    for post in media[:10]:  # Limit to avoid rate limiting
-        await service.get_media_insights(post["id"])
-        insights_count += 1
+    # Only real API data is written; the mock fallbacks never reach the tables
+    ingested = None
+    if access_token:
+        ingested = await ingest_posts(user_id, "instagram", normalize_instagram_media(media))
     
     return {
         "posts_fetched": len(media),
         "insights_fetched": insights_count,
+        "insights_skipped": len(media) - insights_count,
+        "ingested": ingested,
         "followers": user_info.get("followers_count", 0),
         "synced_at": datetime.now().isoformat()
     }
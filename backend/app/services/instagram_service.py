@@ -1,21 +1,128 @@
 """
 Instagram Graph API service for fetching real Instagram statistics.
 """
-import httpx
+import asyncio
 import hashlib
 import random
-from typing import Optional
+import re
+
+import httpx
+from typing import List, Optional
 from datetime import datetime
 
+from app.core.cache import AsyncTTLCache, cached, is_not_none, token_digest
+from app.core.circuit_breaker import get_breaker
+from app.core.config import get_settings
+from app.core.http import get_http_client
+from app.core.rate_limit import RateLimitExceeded, get_rate_limiter
 from app.routers.oauth import get_tokens
 
 
 INSTAGRAM_API_BASE = "https://graph.facebook.com/v18.0"
+ACCOUNT_FIELDS = "id,username,name,biography,followers_count,follows_count,media_count,profile_picture_url"
+
+settings = get_settings()
+
+# get_instagram_insights results keyed by token; a hit skips the account and /insights Graph calls
+analytics_cache = AsyncTTLCache(
+    "instagram.analytics",
+    ttl=settings.platform_analytics_cache_ttl,
+    maxsize=settings.cache_max_entries,
+    stale_ttl=settings.cache_stale_ttl,
+)
+
+# Page -> Instagram Business Account ID per token
+identity_cache = AsyncTTLCache(
+    "instagram.identity",
+    ttl=settings.platform_identity_cache_ttl,
+    maxsize=settings.cache_max_entries,
+)
+
+# Public profile scrapes per handle
+scraper_cache = AsyncTTLCache(
+    "instagram.scraper",
+    ttl=settings.scraper_cache_ttl,
+    maxsize=settings.cache_max_entries,
+)
+
+OG_DESCRIPTION_RE = re.compile(r'<meta property="og:description" content="([^"]+)"')
+FOLLOWED_BY_RE = re.compile(r'"edge_followed_by":{"count":(\d+)}')
+
+# Chars of the previous chunk searched again with the next one, enough for a meta tag split across chunks
+SCRAPER_SEARCH_OVERLAP = 4096
+
+# Browser-like headers for the public profile scraper
+SCRAPER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+# Graph API error codes for app, user and page level throttling
+GRAPH_THROTTLE_CODES = {4, 17, 32, 613}
+
+
+def _is_graph_failure(response: httpx.Response) -> bool:
+    """5xx, or a 4xx carrying one of the Graph API throttling error codes."""
+    if response.status_code >= 500:
+        return True
+    if response.status_code < 400:
+        return False
+    try:
+        error = response.json().get("error") or {}
+    except (ValueError, AttributeError):
+        return False
+    return error.get("code") in GRAPH_THROTTLE_CODES
+
+
+async def graph_request(
+    method: str,
+    url: str,
+    access_token: Optional[str] = None,
+    cost: int = 1,
+    client: Optional[httpx.AsyncClient] = None,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Rate-limited, circuit-broken Graph API call, budgeted per access token.
+    `cost` is the number of Graph calls it makes (one per request inside a
+    batch call); each takes a request slot and a unit of daily quota.
+    Returns a synthetic 429 when the budget is spent and a 503 while the
+    Graph API circuit is open. 5xx and throttling responses count as
+    breaker failures.
+    """
+    breaker = get_breaker("graph_api")
+    if not breaker.allow():
+        return httpx.Response(503, json={"error": {"message": "Graph API circuit open"}})
+    try:
+        await get_rate_limiter("instagram").acquire(access_token, cost, requests=cost)
+    except RateLimitExceeded as e:
+        # Not an upstream failure; just free the probe slot
+        breaker.release()
+        print(f"[Instagram] {e}")
+        return httpx.Response(429, json={"error": {"message": str(e)}})
+    try:
+        response = await (client or get_http_client("instagram")).request(method, url, **kwargs)
+    except (httpx.HTTPError, asyncio.CancelledError) as e:
+        breaker.record_failure(e)
+        raise
+    if _is_graph_failure(response):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
 
 
-async def get_instagram_account() -> Optional[dict]:
+async def graph_get(url: str, params: dict) -> httpx.Response:
+    """Graph API GET, budgeted per the access token in params."""
+    return await graph_request("GET", url, params.get("access_token"), params=params)
+
+
+@cached(identity_cache, key=lambda: token_digest(get_tokens("instagram")), cache_if=is_not_none)
+async def get_instagram_account_id() -> Optional[str]:
     """
-    Get Instagram Business Account info.
+    Resolve the Instagram Business Account ID linked to the user's pages.
+    One call (pages with the linked account embedded), cached per token.
     """
     tokens = get_tokens("instagram")
     if not tokens:
@@ -24,54 +131,56 @@ async def get_instagram_account() -> Optional[dict]:
     
     print(f"✅ It works! Using Instagram Token: {tokens.get('access_token')[:10]}...")
     
-    async with httpx.AsyncClient() as client:
-        # Get user's pages first
-        pages_response = await client.get(
-            f"{INSTAGRAM_API_BASE}/me/accounts",
-            params={"access_token": tokens["access_token"]},
-        )
-        
-        if pages_response.status_code != 200:
-            return None
-        
-        pages = pages_response.json().get("data", [])
-        if not pages:
-            return None
-        
-        # Get Instagram account linked to the first page
-        page_id = pages[0]["id"]
-        ig_response = await client.get(
-            f"{INSTAGRAM_API_BASE}/{page_id}",
-            params={
-                "fields": "instagram_business_account",
-                "access_token": tokens["access_token"],
-            },
-        )
-        
-        if ig_response.status_code != 200:
-            return None
-        
-        ig_data = ig_response.json()
-        ig_account_id = ig_data.get("instagram_business_account", {}).get("id")
-        
-        if not ig_account_id:
-            return None
-        
-        # Get Instagram account details
-        account_response = await client.get(
-            f"{INSTAGRAM_API_BASE}/{ig_account_id}",
-            params={
-                "fields": "id,username,name,biography,followers_count,follows_count,media_count,profile_picture_url",
-                "access_token": tokens["access_token"],
-            },
-        )
-        
-        if account_response.status_code != 200:
-            return None
-        
-        return account_response.json()
+    pages_response = await graph_get(
+        f"{INSTAGRAM_API_BASE}/me/accounts",
+        params={
+            "fields": "id,instagram_business_account",
+            "access_token": tokens["access_token"],
+        },
+    )
+    
+    if pages_response.status_code != 200:
+        return None
+    
+    for page in pages_response.json().get("data", []):
+        ig_account_id = page.get("instagram_business_account", {}).get("id")
+        if ig_account_id:
+            return ig_account_id
+    
+    return None
+
+
+async def _get_account_fields(ig_account_id: str, access_token: str) -> Optional[dict]:
+    account_response = await graph_get(
+        f"{INSTAGRAM_API_BASE}/{ig_account_id}",
+        params={
+            "fields": ACCOUNT_FIELDS,
+            "access_token": access_token,
+        },
+    )
+    
+    if account_response.status_code != 200:
+        return None
+    
+    return account_response.json()
+
+
+async def get_instagram_account() -> Optional[dict]:
+    """
+    Get Instagram Business Account info.
+    """
+    tokens = get_tokens("instagram")
+    if not tokens:
+        return None
+    
+    ig_id = await get_instagram_account_id()
+    if not ig_id:
+        return None
+    
+    return await _get_account_fields(ig_id, tokens["access_token"])
 
 
+@cached(analytics_cache, key=lambda: token_digest(get_tokens("instagram")), cache_if=is_not_none)
 async def get_instagram_insights() -> Optional[dict]:
     """
     Get Instagram account insights (reach, impressions, etc).
@@ -80,26 +189,29 @@ async def get_instagram_insights() -> Optional[dict]:
     if not tokens:
         return None
     
-    account = await get_instagram_account()
-    if not account:
+    ig_id = await get_instagram_account_id()
+    if not ig_id:
         return None
     
-    ig_id = account.get("id")
-    
-    async with httpx.AsyncClient() as client:
-        insights_response = await client.get(
+    # Account fields and insights only need the ID, so fetch them together
+    account, insights_response = await asyncio.gather(
+        _get_account_fields(ig_id, tokens["access_token"]),
+        graph_get(
             f"{INSTAGRAM_API_BASE}/{ig_id}/insights",
             params={
                 "metric": "impressions,reach,profile_views",
                 "period": "day",
                 "access_token": tokens["access_token"],
             },
-        )
-        
-        insights = {}
-        if insights_response.status_code == 200:
-            for item in insights_response.json().get("data", []):
-                insights[item["name"]] = item["values"][0]["value"] if item.get("values") else 0
+        ),
+    )
+    if not account:
+        return None
+    
+    insights = {}
+    if insights_response.status_code == 200:
+        for item in insights_response.json().get("data", []):
+            insights[item["name"]] = item["values"][0]["value"] if item.get("values") else 0
     
     return {
         "platform": "instagram",
@@ -131,38 +243,35 @@ async def get_recent_media(limit: int = 10) -> Optional[list]:
     if not tokens:
         return None
     
-    account = await get_instagram_account()
-    if not account:
+    ig_id = await get_instagram_account_id()
+    if not ig_id:
         return None
     
-    ig_id = account.get("id")
+    media_response = await graph_get(
+        f"{INSTAGRAM_API_BASE}/{ig_id}/media",
+        params={
+            "fields": "id,caption,media_type,media_url,thumbnail_url,timestamp,like_count,comments_count",
+            "limit": limit,
+            "access_token": tokens["access_token"],
+        },
+    )
     
-    async with httpx.AsyncClient() as client:
-        media_response = await client.get(
-            f"{INSTAGRAM_API_BASE}/{ig_id}/media",
-            params={
-                "fields": "id,caption,media_type,media_url,thumbnail_url,timestamp,like_count,comments_count",
-                "limit": limit,
-                "access_token": tokens["access_token"],
-            },
-        )
-        
-        if media_response.status_code != 200:
-            return None
-        
-        media = []
-        for item in media_response.json().get("data", []):
-            media.append({
-                "id": item.get("id"),
-                "caption": (item.get("caption") or "")[:100],
-                "type": item.get("media_type"),
-                "url": item.get("media_url") or item.get("thumbnail_url"),
-                "timestamp": item.get("timestamp"),
-                "likes": item.get("like_count", 0),
-                "comments": item.get("comments_count", 0),
-            })
-        
-        return media
+    if media_response.status_code != 200:
+        return None
+    
+    media = []
+    for item in media_response.json().get("data", []):
+        media.append({
+            "id": item.get("id"),
+            "caption": (item.get("caption") or "")[:100],
+            "type": item.get("media_type"),
+            "url": item.get("media_url") or item.get("thumbnail_url"),
+            "timestamp": item.get("timestamp"),
+            "likes": item.get("like_count", 0),
+            "comments": item.get("comments_count", 0),
+        })
+    
+    return media
     
     
 def get_consistent_fallback_metrics(username: str) -> dict:
@@ -243,6 +352,128 @@ def get_consistent_fallback_metrics(username: str) -> dict:
         "analytics": analytics
     }
 
+def _parse_count(s: str) -> int:
+    """Parse "1.2m" / "350k" / "1,024" style counts."""
+    s = s.lower().replace(",", "")
+    if "k" in s: return int(float(s.replace("k", "")) * 1000)
+    if "m" in s: return int(float(s.replace("m", "")) * 1000000)
+    return int(s) if s.isdigit() else 0
+
+
+def _parse_profile_html(html: str, username_clean: str) -> Optional[dict]:
+    """Build profile stats from the og:description meta tag (or the followers JSON blob)."""
+    # Parse og:description meta tag
+    # Format 1: "100K Followers, 50 Following, 100 Posts - See Instagram photos..."
+    # Format 2: "100K Followers, 50 Following, 100 Posts on Instagram..."
+    match = OG_DESCRIPTION_RE.search(html)
+    if not match:
+        # Alternative regex for different meta placements
+        match = FOLLOWED_BY_RE.search(html)
+        if match:
+            followers_count = int(match.group(1))
+            # Basic estimation if we only get followers
+            return {
+                "platform": "instagram",
+                "connected": True,
+                "is_simulated": False,
+                "account": {
+                    "id": f"real_{username_clean}",
+                    "username": username_clean,
+                    "name": username_clean,
+                    "bio": "Public Web Profile",
+                    "profile_picture": "https://upload.wikimedia.org/wikipedia/commons/a/a5/Instagram_icon.png",
+                },
+                "metrics": {
+                    "followers": followers_count,
+                    "following": 500,
+                    "posts": 100,
+                    "impressions": int(followers_count * 0.2),
+                    "reach": int(followers_count * 0.15),
+                    "profile_views": int(followers_count * 0.01)
+                },
+                "fetched_at": datetime.utcnow().isoformat(),
+            }
+        return None
+
+    content = match.group(1)
+    # Support both "100K Followers" and "100K following" case variants
+    parts = content.split(" - ")[0].split(", ")
+    if len(parts) < 3:
+        return None
+
+    followers_str = re.sub(r'[^0-9km.]', '', parts[0].lower().split(" ")[0])
+    following_str = re.sub(r'[^0-9km.]', '', parts[1].lower().split(" ")[0])
+    posts_str = re.sub(r'[^0-9km.]', '', parts[2].lower().split(" ")[0])
+
+    followers = _parse_count(followers_str)
+    real_metrics = {
+        "followers": followers,
+        "following": _parse_count(following_str),
+        "posts": _parse_count(posts_str),
+        # Estimate other metrics based on followers
+        "impressions": int(followers * 0.2), # Est 20% reach
+        "reach": int(followers * 0.15),
+        "profile_views": int(followers * 0.01)
+    }
+
+    return {
+        "platform": "instagram",
+        "connected": True,
+        "is_simulated": False,  # REAL DATA!
+        "account": {
+            "id": f"real_{username_clean}",
+            "username": username_clean,
+            "name": username_clean,
+            "bio": "Public Web Profile",
+            "profile_picture": "https://upload.wikimedia.org/wikipedia/commons/a/a5/Instagram_icon.png", # Hard to extract dynamic expiration URLs
+        },
+        "metrics": real_metrics,
+        "recent_media": [], # TODO: Scrape media if possible, for now empty is fine for real scrape
+        "fetched_at": datetime.utcnow().isoformat(),
+    }
+
+
+@cached(
+    scraper_cache,
+    key=lambda username_clean: username_clean,
+    # Failed/blocked handles are cached too, but retried sooner
+    ttl=lambda result: settings.scraper_cache_ttl if result else settings.scraper_negative_ttl,
+)
+async def scrape_public_profile(username_clean: str) -> Optional[dict]:
+    """
+    Scrape public profile stats from instagram.com/{handle}.
+    Reads the page as a stream and stops once the stats are found or
+    scraper_max_bytes have been read. Returns None if blocked or unparseable.
+    """
+    chunks: List[str] = []
+    size = 0
+    tail = ""
+    try:
+        client = get_http_client("scraper")
+        async with client.stream(
+            "GET",
+            f"https://www.instagram.com/{username_clean}/",
+            headers=SCRAPER_HEADERS,
+            follow_redirects=True,
+        ) as response:
+            if response.status_code != 200:
+                print(f"Scraping blocked for {username_clean}: HTTP {response.status_code}")
+                return None
+            async for chunk in response.aiter_text():
+                chunks.append(chunk)
+                size += len(chunk)
+                # Only the new chunk (plus an overlap for a tag split across chunks) is searched
+                window = tail + chunk
+                if OG_DESCRIPTION_RE.search(window) or size >= settings.scraper_max_bytes:
+                    break
+                tail = window[-SCRAPER_SEARCH_OVERLAP:]
+        
+        return _parse_profile_html("".join(chunks), username_clean)
+    except Exception as e:
+        print(f"Scraping failed for {username_clean}: {e}")
+        return None
+
+
 async def get_simulated_stats(username: str) -> dict:
     """
     Get stats for a public profile using lightweight scraping first, 
@@ -305,97 +536,10 @@ async def get_simulated_stats(username: str) -> dict:
         }
     }
 
-    # 1. Attempt Real Web Scrape
-    real_data = None
-    try:
-        import re
-        async with httpx.AsyncClient(follow_redirects=True, headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept-Language": "en-US,en;q=0.9",
-        }) as client:
-            response = await client.get(f"https://www.instagram.com/{username_clean}/")
-            if response.status_code == 200:
-                html = response.text
-                
-                # Parse og:description meta tag
-                # Format 1: "100K Followers, 50 Following, 100 Posts - See Instagram photos..."
-                # Format 2: "100K Followers, 50 Following, 100 Posts on Instagram..."
-                match = re.search(r'<meta property="og:description" content="([^"]+)"', html)
-                if not match:
-                    # Alternative regex for different meta placements
-                    match = re.search(r'"edge_followed_by":{"count":(\d+)}', html)
-                    if match:
-                        followers_count = int(match.group(1))
-                        # Basic estimation if we only get followers
-                        real_data = {
-                            "platform": "instagram",
-                            "connected": True,
-                            "is_simulated": False,
-                            "account": {
-                                "id": f"real_{username_clean}",
-                                "username": username_clean,
-                                "name": username, 
-                                "bio": "Public Web Profile",
-                                "profile_picture": "https://upload.wikimedia.org/wikipedia/commons/a/a5/Instagram_icon.png",
-                            },
-                            "metrics": {
-                                "followers": followers_count,
-                                "following": 500,
-                                "posts": 100,
-                                "impressions": int(followers_count * 0.2),
-                                "reach": int(followers_count * 0.15),
-                                "profile_views": int(followers_count * 0.01)
-                            },
-                            "fetched_at": datetime.utcnow().isoformat(),
-                        }
-                        return real_data
-
-                if match:
-                    content = match.group(1)
-                    # Support both "100K Followers" and "100K following" case variants
-                    parts = content.split(" - ")[0].split(", ")
-                    if len(parts) >= 3:
-                        followers_str = re.sub(r'[^0-9km.]', '', parts[0].lower().split(" ")[0])
-                        following_str = re.sub(r'[^0-9km.]', '', parts[1].lower().split(" ")[0])
-                        posts_str = re.sub(r'[^0-9km.]', '', parts[2].lower().split(" ")[0])
-                        
-                        # Helper to parse K/M string to int
-                        def parse_count(s):
-                            s = s.lower().replace(",", "")
-                            if "k" in s: return int(float(s.replace("k", "")) * 1000)
-                            if "m" in s: return int(float(s.replace("m", "")) * 1000000)
-                            return int(s) if s.isdigit() else 0
-
-                        real_metrics = {
-                            "followers": parse_count(followers_str),
-                            "following": parse_count(following_str),
-                            "posts": parse_count(posts_str),
-                            # Estimate other metrics based on followers
-                            "impressions": int(parse_count(followers_str) * 0.2), # Est 20% reach
-                            "reach": int(parse_count(followers_str) * 0.15),
-                            "profile_views": int(parse_count(followers_str) * 0.01)
-                        }
-                        
-                        real_data = {
-                            "platform": "instagram",
-                            "connected": True,
-                            "is_simulated": False,  # REAL DATA!
-                            "account": {
-                                "id": f"real_{username_clean}",
-                                "username": username_clean,
-                                "name": username, 
-                                "bio": "Public Web Profile",
-                                "profile_picture": "https://upload.wikimedia.org/wikipedia/commons/a/a5/Instagram_icon.png", # Hard to extract dynamic expiration URLs
-                            },
-                            "metrics": real_metrics,
-                            "recent_media": [], # TODO: Scrape media if possible, for now empty is fine for real scrape
-                            "fetched_at": datetime.utcnow().isoformat(),
-                        }
-    except Exception as e:
-        print(f"Scraping failed for {username_clean}: {e}")
-
+    # 1. Attempt Real Web Scrape (cached per handle, failures included)
+    real_data = await scrape_public_profile(username_clean)
     if real_data:
-        return real_data
+        return {**real_data, "account": {**real_data["account"], "name": username}}
 
     # 2. Fallback to Intelligent Simulation (Judge-Proof)
     base = known_profiles.get(username_clean)
@@ -441,24 +585,24 @@ async def create_media_container(image_url: str, caption: str) -> str:
         "access_token": access_token
     }
 
-    async with httpx.AsyncClient() as client:
-        # DEV MODE BYPASS: Instagram cannot fetch localhost URLs. 
-        # If we are on localhost, mock the response so the UI flow can be tested.
-        if "localhost" in image_url or "127.0.0.1" in image_url:
-            print(f"⚠️  DEV MODE: Skipping Instagram API call for localhost URL: {image_url}")
-            return "mock_creation_id_12345"
+    client = get_http_client("instagram")
+    # DEV MODE BYPASS: Instagram cannot fetch localhost URLs. 
+    # If we are on localhost, mock the response so the UI flow can be tested.
+    if "localhost" in image_url or "127.0.0.1" in image_url:
+        print(f"⚠️  DEV MODE: Skipping Instagram API call for localhost URL: {image_url}")
+        return "mock_creation_id_12345"
 
-        # Real API Call
-        response = await client.post(url, params=payload)
+    # Real API Call
+    response = await client.post(url, params=payload)
+    
+    if response.status_code != 200:
+        error_data = response.json()
+        print(f"Instagram API Error Body: {error_data}")
+        error_msg = error_data.get("error", {}).get("message", "Unknown error")
+        raise RuntimeError(f"Instagram API Error (Create Container): {error_msg}")
         
-        if response.status_code != 200:
-            error_data = response.json()
-            print(f"Instagram API Error Body: {error_data}")
-            error_msg = error_data.get("error", {}).get("message", "Unknown error")
-            raise RuntimeError(f"Instagram API Error (Create Container): {error_msg}")
-            
-        data = response.json()
-        return data["id"]
+    data = response.json()
+    return data["id"]
 
 
 async def publish_media(creation_id: str) -> dict:
@@ -478,17 +622,17 @@ async def publish_media(creation_id: str) -> dict:
         "access_token": access_token
     }
 
-    async with httpx.AsyncClient() as client:
-        # DEV MODE BYPASS
-        if creation_id == "mock_creation_id_12345":
-            print(f"⚠️  DEV MODE: Mocking successful publish for creation_id: {creation_id}")
-            return {"id": "mock_ig_media_id_98765"}
+    client = get_http_client("instagram")
+    # DEV MODE BYPASS
+    if creation_id == "mock_creation_id_12345":
+        print(f"⚠️  DEV MODE: Mocking successful publish for creation_id: {creation_id}")
+        return {"id": "mock_ig_media_id_98765"}
 
-        response = await client.post(url, params=payload)
+    response = await client.post(url, params=payload)
+    
+    if response.status_code != 200:
+        error_data = response.json()
+        error_msg = error_data.get("error", {}).get("message", "Unknown error")
+        raise RuntimeError(f"Instagram API Error (Publish): {error_msg}")
         
-        if response.status_code != 200:
-            error_data = response.json()
-            error_msg = error_data.get("error", {}).get("message", "Unknown error")
-            raise RuntimeError(f"Instagram API Error (Publish): {error_msg}")
-            
-        return response.json()
+    return response.json()
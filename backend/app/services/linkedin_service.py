@@ -1,56 +1,72 @@
 """
 LinkedIn API service for fetching real LinkedIn statistics.
 """
-import httpx
+import asyncio
 from typing import Optional
 from datetime import datetime
 
+from app.core.cache import AsyncTTLCache, cached, is_not_none, token_digest
+from app.core.config import get_settings
+from app.core.http import get_http_client
 from app.routers.oauth import get_tokens
 
 
 LINKEDIN_API_BASE = "https://api.linkedin.com/v2"
 
+# Basic profile fields plus the profile picture, in a single /me call
+PROFILE_PROJECTION = "(id,localizedFirstName,localizedLastName,profilePicture(displayImage~:playableStreams))"
 
+settings = get_settings()
+
+# get_linkedin_analytics results keyed by token; a hit skips the profile and connections lookups
+analytics_cache = AsyncTTLCache(
+    "linkedin.analytics",
+    ttl=settings.platform_analytics_cache_ttl,
+    maxsize=settings.cache_max_entries,
+    stale_ttl=settings.cache_stale_ttl,
+)
+
+# Per-token profile cache (name/picture change rarely)
+profile_cache = AsyncTTLCache(
+    "linkedin.profile",
+    ttl=settings.platform_identity_cache_ttl,
+    maxsize=settings.cache_max_entries,
+)
+
+
+@cached(profile_cache, key=lambda: token_digest(get_tokens("linkedin")), cache_if=is_not_none)
 async def get_linkedin_profile() -> Optional[dict]:
     """
-    Get authenticated LinkedIn profile info.
+    Get authenticated LinkedIn profile info (cached per token).
     """
     tokens = get_tokens("linkedin")
     if not tokens:
         return None
     
-    async with httpx.AsyncClient() as client:
-        # Get basic profile
-        profile_response = await client.get(
-            f"{LINKEDIN_API_BASE}/me",
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
-        
-        if profile_response.status_code != 200:
-            return None
-        
-        profile = profile_response.json()
-        
-        # Get profile picture
-        picture_response = await client.get(
-            f"{LINKEDIN_API_BASE}/me",
-            params={"projection": "(profilePicture(displayImage~:playableStreams))"},
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
-        
-        picture_url = None
-        if picture_response.status_code == 200:
-            picture_data = picture_response.json()
-            elements = picture_data.get("profilePicture", {}).get("displayImage~", {}).get("elements", [])
-            if elements:
-                picture_url = elements[-1].get("identifiers", [{}])[0].get("identifier")
-        
-        return {
-            "id": profile.get("id"),
-            "first_name": profile.get("localizedFirstName"),
-            "last_name": profile.get("localizedLastName"),
-            "profile_picture": picture_url,
-        }
+    client = get_http_client("linkedin")
+    # Basic profile and picture in one projection
+    profile_response = await client.get(
+        f"{LINKEDIN_API_BASE}/me",
+        params={"projection": PROFILE_PROJECTION},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    
+    if profile_response.status_code != 200:
+        return None
+    
+    profile = profile_response.json()
+    
+    picture_url = None
+    elements = profile.get("profilePicture", {}).get("displayImage~", {}).get("elements", [])
+    if elements:
+        picture_url = elements[-1].get("identifiers", [{}])[0].get("identifier")
+    
+    return {
+        "id": profile.get("id"),
+        "first_name": profile.get("localizedFirstName"),
+        "last_name": profile.get("localizedLastName"),
+        "profile_picture": picture_url,
+    }
 
 
 async def get_linkedin_connections() -> Optional[int]:
@@ -62,26 +78,26 @@ async def get_linkedin_connections() -> Optional[int]:
     if not tokens:
         return None
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{LINKEDIN_API_BASE}/connections",
-            params={"q": "viewer", "count": 0},
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
-        
-        if response.status_code != 200:
-            # LinkedIn restricts this endpoint, return None
-            return None
-        
-        return response.json().get("_total", 0)
+    client = get_http_client("linkedin")
+    response = await client.get(
+        f"{LINKEDIN_API_BASE}/connections",
+        params={"q": "viewer", "count": 0},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    
+    if response.status_code != 200:
+        # LinkedIn restricts this endpoint, return None
+        return None
+    
+    return response.json().get("_total", 0)
 
 
+@cached(analytics_cache, key=lambda: token_digest(get_tokens("linkedin")), cache_if=is_not_none)
 async def get_linkedin_analytics() -> Optional[dict]:
     """
     Get comprehensive LinkedIn analytics.
     """
-    profile = await get_linkedin_profile()
-    connections = await get_linkedin_connections()
+    profile, connections = await asyncio.gather(get_linkedin_profile(), get_linkedin_connections())
     
     if not profile:
         return None
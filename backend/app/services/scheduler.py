@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Optional
 import logging
 
-from app.core.supabase import get_supabase
+from app.core.supabase import execute, get_supabase
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +28,7 @@ async def sync_all_platforms():
     
     try:
         # Get all connected platforms
-        response = supabase.table("platforms").select("*").execute()
+        response = await execute(supabase.table("platforms").select("*"))
         
         if not response.data:
             logger.info("No connected platforms found")
@@ -63,15 +63,19 @@ async def sync_platform(user_id: str, platform_name: str, access_token: str):
         from .instagram import sync_instagram_data
         result = await sync_instagram_data(user_id, access_token)
         
+    elif platform_name == "twitter":
+        from .twitter_service import sync_twitter_data
+        result = await sync_twitter_data(user_id, access_token)
+        
     else:
         logger.info(f"Sync not implemented for {platform_name}")
         return
     
     # Update last_synced_at
     supabase = get_supabase()
-    supabase.table("platforms").update({
+    await execute(supabase.table("platforms").update({
         "last_synced_at": datetime.now().isoformat()
-    }).eq("user_id", user_id).eq("platform_name", platform_name).execute()
+    }).eq("user_id", user_id).eq("platform_name", platform_name))
     
     logger.info(f"Sync complete for {platform_name}: {result}")
 
@@ -1,88 +1,225 @@
 """
 Twitter API v2 service for fetching real Twitter statistics.
 """
-import httpx
-from typing import Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
+from app.core.cache import AsyncTTLCache, cached, is_not_none, token_digest
+from app.core.config import get_settings
+from app.core.http import get_http_client
+from app.core.supabase import execute, get_supabase, get_supabase_admin
 from app.routers.oauth import get_tokens
+from app.services.ingestion import ingest_posts, normalize_tweets
 
 
 TWITTER_API_BASE = "https://api.twitter.com/2"
+TWEETS_LOOKUP_MAX_IDS = 100  # Max IDs per GET /2/tweets call
+TIMELINE_MAX_RESULTS = 100  # Max tweets per GET /2/users/:id/tweets page
 
+settings = get_settings()
 
-async def get_twitter_user() -> Optional[dict]:
+# get_twitter_analytics results keyed by token; a hit skips the /users/me and timeline calls
+analytics_cache = AsyncTTLCache(
+    "twitter.analytics",
+    ttl=settings.platform_analytics_cache_ttl,
+    maxsize=settings.cache_max_entries,
+    stale_ttl=settings.cache_stale_ttl,
+)
+
+# Authenticated user ID per token (identity rarely changes, so it outlives analytics)
+identity_cache = AsyncTTLCache(
+    "twitter.identity",
+    ttl=settings.platform_identity_cache_ttl,
+    maxsize=settings.cache_max_entries,
+)
+
+
+def _tokens(access_token: Optional[str] = None) -> Optional[dict]:
+    """Token dict for access_token (scheduled syncs), else the connected account's."""
+    return {"access_token": access_token} if access_token else get_tokens("twitter")
+
+
+async def get_twitter_user(access_token: Optional[str] = None) -> Optional[dict]:
     """
     Get authenticated Twitter user info.
     """
-    tokens = get_tokens("twitter")
+    tokens = _tokens(access_token)
     if not tokens:
         return None
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{TWITTER_API_BASE}/users/me",
-            params={
-                "user.fields": "id,name,username,description,profile_image_url,public_metrics,verified",
-            },
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
+    client = get_http_client("twitter")
+    response = await client.get(
+        f"{TWITTER_API_BASE}/users/me",
+        params={
+            "user.fields": "id,name,username,description,profile_image_url,public_metrics,verified",
+        },
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
     
     if response.status_code != 200:
         return None
     
-    return response.json().get("data")
+    user = response.json().get("data")
+    if user and user.get("id"):
+        identity_cache.set(token_digest(tokens), user["id"])
+    return user
+
+
+async def get_twitter_user_id(access_token: Optional[str] = None) -> Optional[str]:
+    """
+    Get the authenticated user's ID, cached per token.
+    """
+    key = token_digest(_tokens(access_token))
+    if not key:
+        return None
+    
+    user_id = identity_cache.get(key)
+    if user_id:
+        return user_id
+    
+    user = await get_twitter_user(access_token)
+    return user.get("id") if user else None
+
+
+def _parse_tweet_metrics(tweet: dict) -> dict:
+    metrics = tweet.get("public_metrics", {})
+    return {
+        "likes": metrics.get("like_count", 0),
+        "retweets": metrics.get("retweet_count", 0),
+        "replies": metrics.get("reply_count", 0),
+        "impressions": metrics.get("impression_count", 0),
+    }
+
+
+def _parse_tweet(tweet: dict) -> dict:
+    return {
+        "id": tweet.get("id"),
+        "text": tweet.get("text"),
+        "created_at": tweet.get("created_at"),
+        **_parse_tweet_metrics(tweet),
+    }
 
 
-async def get_recent_tweets(max_results: int = 10) -> Optional[list]:
+async def get_recent_tweets(
+    max_results: int = 10,
+    user_id: Optional[str] = None,
+    access_token: Optional[str] = None
+) -> Optional[list]:
     """
     Get recent tweets from authenticated user.
+    Pass user_id when it is already known to skip the identity lookup.
     """
-    tokens = get_tokens("twitter")
+    tokens = _tokens(access_token)
     if not tokens:
         return None
     
-    user = await get_twitter_user()
-    if not user:
+    user_id = user_id or await get_twitter_user_id(access_token)
+    if not user_id:
         return None
     
-    user_id = user.get("id")
+    client = get_http_client("twitter")
+    response = await client.get(
+        f"{TWITTER_API_BASE}/users/{user_id}/tweets",
+        params={
+            "max_results": max_results,
+            "tweet.fields": "created_at,public_metrics,source",
+        },
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    
+    if response.status_code != 200:
+        return None
+    
+    return [_parse_tweet(tweet) for tweet in response.json().get("data", [])]
+
+
+async def refresh_tweet_metrics(
+    tweet_ids: List[str],
+    access_token: Optional[str] = None
+) -> Optional[Dict[str, dict]]:
+    """
+    Get known tweets with their current public metrics, keyed by tweet ID.
+    Uses the tweets lookup endpoint (100 IDs per call) instead of re-paging
+    the timeline, so older tweets cost one request per hundred.
+    """
+    tokens = _tokens(access_token)
+    if not tokens:
+        return None
+    
+    client = get_http_client("twitter")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
     
-    async with httpx.AsyncClient() as client:
+    async def lookup(ids: List[str]) -> Optional[list]:
         response = await client.get(
-            f"{TWITTER_API_BASE}/users/{user_id}/tweets",
-            params={
-                "max_results": max_results,
-                "tweet.fields": "created_at,public_metrics,source",
-            },
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+            f"{TWITTER_API_BASE}/tweets",
+            params={"ids": ",".join(ids), "tweet.fields": "created_at,public_metrics"},
+            headers=headers,
         )
+        if response.status_code != 200:
+            return None
+        # Deleted/protected tweets come back under "errors" and are skipped
+        return response.json().get("data", [])
     
-    if response.status_code != 200:
+    chunks = [tweet_ids[i:i + TWEETS_LOOKUP_MAX_IDS] for i in range(0, len(tweet_ids), TWEETS_LOOKUP_MAX_IDS)]
+    results = await asyncio.gather(*(lookup(chunk) for chunk in chunks))
+    if chunks and all(result is None for result in results):
         return None
     
-    tweets = []
-    for tweet in response.json().get("data", []):
-        metrics = tweet.get("public_metrics", {})
-        tweets.append({
-            "id": tweet.get("id"),
-            "text": tweet.get("text"),
-            "created_at": tweet.get("created_at"),
-            "likes": metrics.get("like_count", 0),
-            "retweets": metrics.get("retweet_count", 0),
-            "replies": metrics.get("reply_count", 0),
-            "impressions": metrics.get("impression_count", 0),
-        })
+    return {
+        tweet["id"]: _parse_tweet(tweet)
+        for result in results if result
+        for tweet in result
+    }
+
+
+async def sync_twitter_data(user_id: str, access_token: str) -> Dict[str, Any]:
+    """
+    Sync Twitter data for a user.
+    
+    New tweets come from the latest timeline page; tweets already stored
+    are refreshed through refresh_tweet_metrics instead of paging further
+    back through the timeline. Both are saved as new metrics snapshots.
+    """
+    recent = await get_recent_tweets(TIMELINE_MAX_RESULTS, access_token=access_token) or []
+    
+    supabase = get_supabase_admin() or get_supabase()
+    stored = await execute(
+        supabase.table("posts")
+        .select("platform_post_id")
+        .eq("user_id", user_id)
+        .eq("platform", "twitter")
+        .order("posted_at", desc=True)
+        .limit(settings.twitter_sync_max_tweets)
+    )
+    recent_ids = {tweet["id"] for tweet in recent}
+    older_ids = [row["platform_post_id"] for row in stored.data or [] if row["platform_post_id"] not in recent_ids]
+    refreshed = await refresh_tweet_metrics(older_ids, access_token) if older_ids else {}
     
-    return tweets
+    tweets = recent + list((refreshed or {}).values())
+    ingested = await ingest_posts(user_id, "twitter", normalize_tweets(tweets)) if tweets else None
+    
+    return {
+        "tweets_fetched": len(recent),
+        "tweets_refreshed": len(refreshed or {}),
+        "tweets_missing": len(older_ids) - len(refreshed or {}),
+        "ingested": ingested,
+        "synced_at": datetime.now().isoformat()
+    }
 
 
+@cached(analytics_cache, key=lambda: token_digest(get_tokens("twitter")), cache_if=is_not_none)
 async def get_twitter_analytics() -> Optional[dict]:
     """
     Get comprehensive Twitter analytics.
     """
-    user = await get_twitter_user()
-    tweets = await get_recent_tweets(10)
+    # With the user ID already known, profile and timeline load concurrently
+    user_id = identity_cache.get(token_digest(get_tokens("twitter")))
+    if user_id:
+        user, tweets = await asyncio.gather(get_twitter_user(), get_recent_tweets(10, user_id=user_id))
+    else:
+        user = await get_twitter_user()
+        tweets = await get_recent_tweets(10, user_id=user.get("id")) if user else None
     
     if not user:
         return None
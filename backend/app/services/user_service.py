@@ -8,7 +8,20 @@ from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 from supabase import Client
 
-from app.core.supabase import get_supabase, get_supabase_admin
+from app.core.cache import AsyncTTLCache, is_not_none
+from app.core.config import get_settings
+from app.core.supabase import execute, get_supabase, get_supabase_admin
+
+settings = get_settings()
+
+# Profiles by user_id. Auth dependencies read the profile on every request;
+# every write below updates or drops the entry, so the TTL only bounds how
+# long changes made outside this process (SQL editor, another worker) take.
+profile_cache = AsyncTTLCache(
+    "profiles",
+    ttl=settings.profile_cache_ttl,
+    maxsize=settings.cache_max_entries,
+)
 
 
 class UserService:
@@ -29,13 +42,33 @@ class UserService:
         Returns:
             Profile dict or None if not found
         """
+        return await profile_cache.get_or_load(
+            user_id,
+            lambda: self._fetch_profile(user_id),
+            cache_if=is_not_none,
+        )
+    
+    async def _fetch_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
         try:
-            response = self.supabase.table("profiles").select("*").eq("id", user_id).single().execute()
+            response = await execute(self.supabase.table("profiles").select("*").eq("id", user_id).single())
             return response.data
         except Exception as e:
             print(f"Error fetching profile: {e}")
             return None
     
+    def _write_through(self, user_id: str, response) -> Optional[Dict[str, Any]]:
+        """Cache the row a write returned, or drop the entry if it returned none."""
+        profile = response.data[0] if response.data else None
+        if profile:
+            profile_cache.set(user_id, profile)
+        else:
+            profile_cache.invalidate(user_id)
+        return profile
+    
+    def invalidate_profile(self, user_id: str) -> None:
+        """Forget a cached profile after it was changed elsewhere."""
+        profile_cache.invalidate(user_id)
+    
     async def get_or_create_profile(
         self, 
         user_id: str, 
@@ -71,8 +104,8 @@ class UserService:
         }
         
         try:
-            response = self.supabase.table("profiles").insert(new_profile).execute()
-            return response.data[0] if response.data else new_profile
+            response = await execute(self.supabase.table("profiles").insert(new_profile))
+            return self._write_through(user_id, response) or new_profile
         except Exception as e:
             print(f"Error creating profile: {e}")
             # Return the profile data even if insert fails (might already exist)
@@ -110,10 +143,11 @@ class UserService:
             update_data["trial_ends_at"] = (datetime.utcnow() + timedelta(days=7)).isoformat()
         
         try:
-            response = self.supabase.table("profiles").update(update_data).eq("id", user_id).execute()
-            return response.data[0] if response.data else None
+            response = await execute(self.supabase.table("profiles").update(update_data).eq("id", user_id))
+            return self._write_through(user_id, response)
         except Exception as e:
             print(f"Error updating plan: {e}")
+            profile_cache.invalidate(user_id)
             return None
     
     async def update_profile(
@@ -134,10 +168,11 @@ class UserService:
         data["updated_at"] = datetime.utcnow().isoformat()
         
         try:
-            response = self.supabase.table("profiles").update(data).eq("id", user_id).execute()
-            return response.data[0] if response.data else None
+            response = await execute(self.supabase.table("profiles").update(data).eq("id", user_id))
+            return self._write_through(user_id, response)
         except Exception as e:
             print(f"Error updating profile: {e}")
+            profile_cache.invalidate(user_id)
             return None
     
     async def save_onboarding_preferences(
@@ -168,10 +203,11 @@ class UserService:
         }
         
         try:
-            response = self.supabase.table("profiles").update(update_data).eq("id", user_id).execute()
-            return response.data[0] if response.data else None
+            response = await execute(self.supabase.table("profiles").update(update_data).eq("id", user_id))
+            return self._write_through(user_id, response)
         except Exception as e:
             print(f"Error saving onboarding preferences: {e}")
+            profile_cache.invalidate(user_id)
             return None
 
 
@@ -2,11 +2,14 @@
 Service for AI Voice Coach features.
 Handles script analysis using OpenAI and text-to-speech using ElevenLabs.
 """
-import httpx
 import google.generativeai as genai
 import json
 from typing import Dict, Any, List, Optional
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, gemini_breaker, get_breaker
 from app.core.config import get_settings
+from app.core.deadline import with_deadline
+from app.core.http import get_http_client
+from app.core.rate_limit import RateLimitExceeded, get_rate_limiter
 
 settings = get_settings()
 
@@ -56,6 +59,12 @@ class VoiceService:
         
         last_error = None
         
+        # Skip every model while Gemini is known to be failing
+        breaker = gemini_breaker(self.gemini_key)
+        if not breaker.allow():
+            last_error = CircuitOpenError(breaker.name)
+            models_to_try = []
+        
         for model_name in models_to_try:
             print(f"DEBUG: Trying model {model_name}...")
             try:
@@ -102,7 +111,8 @@ class VoiceService:
                     try:
                         print(f"DEBUG: Calling Gemini API (Attempt {attempt+1})...")
                         print(f"DEBUG: Calling Gemini API (Attempt {attempt+1})...")
-                        response = await model.generate_content_async(prompt)
+                        await get_rate_limiter("gemini").acquire(self.gemini_key)
+                        response = await with_deadline(model.generate_content_async(prompt))
                         print(f"DEBUG: Gemini response: {response.text[:100]}...")
                         
                         text = response.text.strip()
@@ -112,6 +122,7 @@ class VoiceService:
                         if json_match:
                             text = json_match.group(0)
                         
+                        breaker.record_success()
                         return json.loads(text)
                         
                     except exceptions.ResourceExhausted:
@@ -125,9 +136,13 @@ class VoiceService:
             except Exception as e:
                 print(f"DEBUG: Failed with {model_name}: {e}")
                 last_error = e
+                if isinstance(e, RateLimitExceeded):
+                    break # Budget is per key, other models won't fare better
                 continue # Try next model
                 
         print(f"ERROR: All models failed. Last error: {last_error}")
+        if models_to_try:
+            breaker.record_failure(last_error)
         return {
             "average_hook": "Error: AI Service Unavailable",
             "high_retention_hook": f"We are experiencing high traffic with our AI provider. Please try again in a few minutes. (Error: {str(last_error)[:50]}...)",
@@ -143,13 +158,16 @@ class VoiceService:
         """
         print(f"DEBUG: Generating audio. ElevenLabs key present: {bool(self.elevenlabs_key)}")
         
-        # Try ElevenLabs first
-        if self.elevenlabs_key:
+        # Try ElevenLabs first (skipped while its circuit is open)
+        breaker = get_breaker("elevenlabs")
+        if self.elevenlabs_key and breaker.allow() and await self._elevenlabs_budget(breaker):
             try:
                 audio = await self._generate_with_elevenlabs(text, voice_id)
+                breaker.record_success()
                 if audio:
                     return audio
             except Exception as e:
+                breaker.record_failure(e)
                 print(f"WARNING: ElevenLabs failed: {e}. Trying gTTS fallback...")
         
         # Fallback to gTTS (free, no API key needed)
@@ -159,6 +177,16 @@ class VoiceService:
             print(f"ERROR: gTTS fallback also failed: {e}")
             raise Exception(f"All TTS services failed. Last error: {e}")
     
+    async def _elevenlabs_budget(self, breaker: CircuitBreaker) -> bool:
+        """Take an ElevenLabs rate-limit slot once the breaker has let the call through."""
+        try:
+            await get_rate_limiter("elevenlabs").acquire(self.elevenlabs_key)
+            return True
+        except RateLimitExceeded as e:
+            breaker.release()
+            print(f"WARNING: {e}. Trying gTTS fallback...")
+            return False
+    
     async def _generate_with_elevenlabs(self, text: str, voice_id: str) -> bytes:
         """Generate audio using ElevenLabs API."""
         url = f"{self.elevenlabs_url}/text-to-speech/{voice_id}"
@@ -178,17 +206,17 @@ class VoiceService:
             }
         }
         
-        async with httpx.AsyncClient() as client:
-            print(f"DEBUG: Sending request to ElevenLabs: {url}")
-            response = await client.post(url, json=data, headers=headers, timeout=30.0)
+        client = get_http_client("elevenlabs")
+        print(f"DEBUG: Sending request to ElevenLabs: {url}")
+        response = await client.post(url, json=data, headers=headers, timeout=30.0)
+        
+        if response.status_code != 200:
+            error_msg = response.text
+            print(f"ERROR: ElevenLabs API Error ({response.status_code}): {error_msg}")
+            raise Exception(f"ElevenLabs error: {response.status_code}")
             
-            if response.status_code != 200:
-                error_msg = response.text
-                print(f"ERROR: ElevenLabs API Error ({response.status_code}): {error_msg}")
-                raise Exception(f"ElevenLabs error: {response.status_code}")
-                
-            print("DEBUG: Audio generated successfully via ElevenLabs")
-            return response.content
+        print("DEBUG: Audio generated successfully via ElevenLabs")
+        return response.content
     
     async def _generate_with_gtts(self, text: str) -> bytes:
         """Fallback: Generate audio using gTTS (Google Text-to-Speech - FREE)."""
@@ -1,11 +1,12 @@
 """
 YouTube Data API service for fetching real channel and video statistics.
 """
-import httpx
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional
 from datetime import datetime
 
+from app.core.http import get_http_client
 from app.routers.oauth import get_tokens
+from app.services.youtube import YouTubeService, youtube_get
 
 
 YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
@@ -20,16 +21,17 @@ async def get_channel_stats() -> Optional[dict]:
     if not tokens:
         return None
     
-    async with httpx.AsyncClient() as client:
-        # Get channel info for authenticated user
-        response = await client.get(
-            f"{YOUTUBE_API_BASE}/channels",
-            params={
-                "part": "snippet,statistics,contentDetails",
-                "mine": "true",
-            },
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
+    client = get_http_client("youtube")
+    # Get channel info for authenticated user
+    response = await youtube_get(
+        client,
+        f"{YOUTUBE_API_BASE}/channels",
+        params={
+            "part": "snippet,statistics,contentDetails",
+            "mine": "true",
+        },
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
     
     if response.status_code != 200:
         return None
@@ -62,85 +64,102 @@ async def get_recent_videos(max_results: int = 10) -> Optional[list]:
     if not tokens:
         return None
     
-    async with httpx.AsyncClient() as client:
-        # First get channel's uploads playlist
-        channel_response = await client.get(
-            f"{YOUTUBE_API_BASE}/channels",
-            params={
-                "part": "contentDetails",
-                "mine": "true",
-            },
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
-        
-        if channel_response.status_code != 200:
-            return None
-        
-        channel_data = channel_response.json()
-        if not channel_data.get("items"):
-            return None
-        
-        uploads_playlist = channel_data["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
-        
-        # Get videos from uploads playlist
-        playlist_response = await client.get(
-            f"{YOUTUBE_API_BASE}/playlistItems",
-            params={
-                "part": "snippet,contentDetails",
-                "playlistId": uploads_playlist,
-                "maxResults": max_results,
-            },
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
-        
-        if playlist_response.status_code != 200:
-            return None
-        
-        playlist_data = playlist_response.json()
-        video_ids = [item["contentDetails"]["videoId"] for item in playlist_data.get("items", [])]
-        
-        if not video_ids:
-            return []
-        
-        # Get video statistics
-        videos_response = await client.get(
-            f"{YOUTUBE_API_BASE}/videos",
-            params={
-                "part": "snippet,statistics,contentDetails",
-                "id": ",".join(video_ids),
-            },
-            headers={"Authorization": f"Bearer {tokens['access_token']}"},
-        )
-        
-        if videos_response.status_code != 200:
-            return None
-        
-        videos_data = videos_response.json()
+    client = get_http_client("youtube")
+    # First get channel's uploads playlist
+    channel_response = await youtube_get(
+        client,
+        f"{YOUTUBE_API_BASE}/channels",
+        params={
+            "part": "contentDetails",
+            "mine": "true",
+        },
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    
+    if channel_response.status_code != 200:
+        return None
+    
+    channel_data = channel_response.json()
+    if not channel_data.get("items"):
+        return None
+    
+    uploads_playlist = channel_data["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+    
+    # Get videos from uploads playlist
+    playlist_response = await youtube_get(
+        client,
+        f"{YOUTUBE_API_BASE}/playlistItems",
+        params={
+            "part": "snippet,contentDetails",
+            "playlistId": uploads_playlist,
+            "maxResults": max_results,
+        },
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    
+    if playlist_response.status_code != 200:
+        return None
+    
+    playlist_data = playlist_response.json()
+    video_ids = [item["contentDetails"]["videoId"] for item in playlist_data.get("items", [])]
+    
+    if not video_ids:
+        return []
+    
+    # Get video statistics
+    videos_response = await youtube_get(
+        client,
+        f"{YOUTUBE_API_BASE}/videos",
+        params={
+            "part": "snippet,statistics,contentDetails",
+            "id": ",".join(video_ids),
+        },
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    
+    if videos_response.status_code != 200:
+        return None
+    
+    videos_data = videos_response.json()
+    
+    videos = []
+    for video in videos_data.get("items", []):
+        snippet = video.get("snippet", {})
+        stats = video.get("statistics", {})
+        content = video.get("contentDetails", {})
         
-        videos = []
-        for video in videos_data.get("items", []):
-            snippet = video.get("snippet", {})
-            stats = video.get("statistics", {})
-            content = video.get("contentDetails", {})
-            
-            # Check if it's a Short (duration < 60s)
-            duration = content.get("duration", "PT0S")
-            is_short = _parse_duration(duration) <= 60
-            
-            videos.append({
-                "video_id": video.get("id"),
-                "title": snippet.get("title"),
-                "description": snippet.get("description", "")[:100],
-                "thumbnail": snippet.get("thumbnails", {}).get("medium", {}).get("url"),
-                "published_at": snippet.get("publishedAt"),
-                "views": int(stats.get("viewCount", 0)),
-                "likes": int(stats.get("likeCount", 0)),
-                "comments": int(stats.get("commentCount", 0)),
-                "duration": duration,
-                "is_short": is_short,
-            })
+        # Check if it's a Short (duration < 60s)
+        duration = content.get("duration", "PT0S")
+        is_short = _parse_duration(duration) <= 60
         
-        return videos
+        videos.append({
+            "video_id": video.get("id"),
+            "title": snippet.get("title"),
+            "description": snippet.get("description", "")[:100],
+            "thumbnail": snippet.get("thumbnails", {}).get("medium", {}).get("url"),
+            "published_at": snippet.get("publishedAt"),
+            "views": int(stats.get("viewCount", 0)),
+            "likes": int(stats.get("likeCount", 0)),
+            "comments": int(stats.get("commentCount", 0)),
+            "duration": duration,
+            "is_short": is_short,
+        })
+    
+    return videos
+
+
+async def iter_all_videos(max_videos: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream the authenticated channel's full upload history with statistics.
+    See YouTubeService.iter_channel_videos.
+    """
+    tokens = get_tokens("youtube")
+    if not tokens:
+        return
+    
+    service = YouTubeService(access_token=tokens["access_token"])
+    async for video in service.iter_channel_videos(max_videos=max_videos):
+        yield video
 
 
 def _parse_duration(duration: str) -> int:
@@ -0,0 +1,72 @@
+-- Migration: Server-side analytics aggregation
+-- The analytics endpoints used to fetch every metrics row and sum them in Python.
+-- analytics_summary() does the aggregation in Postgres and returns a single row,
+-- so the payload no longer grows with post history.
+-- Call through PostgREST: supabase.rpc("analytics_summary", {...})
+
+CREATE OR REPLACE FUNCTION analytics_summary(
+    p_user_id UUID,
+    p_since TIMESTAMP WITH TIME ZONE,
+    p_platform TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    post_count BIGINT,
+    metric_rows BIGINT,
+    total_likes BIGINT,
+    total_comments BIGINT,
+    total_shares BIGINT,
+    total_reach BIGINT,
+    total_impressions BIGINT,
+    avg_engagement_rate NUMERIC,
+    growth_rate NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH scoped AS (
+        SELECT m.likes, m.comments, m.shares, m.reach, m.impressions,
+               m.engagement_rate, m.collected_at
+        FROM metrics m
+        JOIN posts p ON p.id = m.post_id
+        WHERE p.user_id = p_user_id
+          AND m.collected_at >= p_since
+          AND (p_platform IS NULL OR p.platform = p_platform)
+    ),
+    midpoint AS (
+        -- Growth compares the newer half of the window with the older half
+        SELECT percentile_disc(0.5) WITHIN GROUP (ORDER BY collected_at) AS mid
+        FROM scoped
+    ),
+    totals AS (
+        SELECT
+            COUNT(*) AS metric_rows,
+            COALESCE(SUM(s.likes), 0) AS total_likes,
+            COALESCE(SUM(s.comments), 0) AS total_comments,
+            COALESCE(SUM(s.shares), 0) AS total_shares,
+            COALESCE(SUM(s.reach), 0) AS total_reach,
+            COALESCE(SUM(s.impressions), 0) AS total_impressions,
+            ROUND(AVG(s.engagement_rate), 2) AS avg_engagement_rate,
+            AVG(s.engagement_rate) FILTER (WHERE s.collected_at >= mp.mid) AS recent_rate,
+            AVG(s.engagement_rate) FILTER (WHERE s.collected_at < mp.mid) AS older_rate
+        FROM scoped s CROSS JOIN midpoint mp
+    )
+    SELECT
+        (SELECT COUNT(*) FROM posts p
+         WHERE p.user_id = p_user_id
+           AND (p_platform IS NULL OR p.platform = p_platform)) AS post_count,
+        t.metric_rows,
+        t.total_likes,
+        t.total_comments,
+        t.total_shares,
+        t.total_reach,
+        t.total_impressions,
+        t.avg_engagement_rate,
+        CASE WHEN t.metric_rows >= 2 AND t.older_rate > 0
+             THEN ROUND((t.recent_rate - t.older_rate) / t.older_rate * 100, 2)
+        END AS growth_rate
+    FROM totals t;
+$$;
+
+-- Speeds up the posts -> metrics join for a user's window
+CREATE INDEX IF NOT EXISTS idx_posts_user_platform ON posts(user_id, platform);
+CREATE INDEX IF NOT EXISTS idx_metrics_post_collected ON metrics(post_id, collected_at DESC);
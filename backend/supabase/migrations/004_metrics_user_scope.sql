@@ -0,0 +1,112 @@
+-- Migration: Tenant-scoped metrics
+-- metrics rows were only reachable per user through posts, so time-window reads
+-- (collected_at >= ...) scanned every tenant's rows. This denormalizes the owning
+-- user onto metrics, backfills it, keeps it filled on insert and indexes
+-- (user_id, collected_at DESC) so analytics reads only touch the caller's rows.
+
+-- Step 1: Add and backfill the owner column
+ALTER TABLE metrics ADD COLUMN IF NOT EXISTS user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE;
+
+UPDATE metrics m
+SET user_id = p.user_id
+FROM posts p
+WHERE p.id = m.post_id AND m.user_id IS NULL;
+
+ALTER TABLE metrics ALTER COLUMN user_id SET NOT NULL;
+
+-- Step 2: Fill user_id from the parent post when an insert leaves it out
+CREATE OR REPLACE FUNCTION set_metrics_user_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.user_id IS NULL THEN
+        SELECT user_id INTO NEW.user_id FROM posts WHERE id = NEW.post_id;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS metrics_set_user_id ON metrics;
+CREATE TRIGGER metrics_set_user_id
+    BEFORE INSERT ON metrics
+    FOR EACH ROW EXECUTE FUNCTION set_metrics_user_id();
+
+-- Step 3: Composite index for per-user time windows
+CREATE INDEX IF NOT EXISTS idx_metrics_user_collected ON metrics(user_id, collected_at DESC);
+
+-- Step 4: RLS checks the column directly instead of a posts lookup per row
+DROP POLICY IF EXISTS "Users can view metrics for their posts" ON metrics;
+CREATE POLICY "Users can view metrics for their posts" ON metrics
+    FOR SELECT USING (auth.uid() = user_id);
+
+DROP POLICY IF EXISTS "Users can insert metrics for their posts" ON metrics;
+CREATE POLICY "Users can insert metrics for their posts" ON metrics
+    FOR INSERT WITH CHECK (
+        auth.uid() = user_id
+        AND EXISTS (SELECT 1 FROM posts WHERE posts.id = metrics.post_id AND posts.user_id = auth.uid())
+    );
+
+-- Step 5: Scope analytics_summary (migration 003) through the new index
+CREATE OR REPLACE FUNCTION analytics_summary(
+    p_user_id UUID,
+    p_since TIMESTAMP WITH TIME ZONE,
+    p_platform TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    post_count BIGINT,
+    metric_rows BIGINT,
+    total_likes BIGINT,
+    total_comments BIGINT,
+    total_shares BIGINT,
+    total_reach BIGINT,
+    total_impressions BIGINT,
+    avg_engagement_rate NUMERIC,
+    growth_rate NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH scoped AS (
+        SELECT m.likes, m.comments, m.shares, m.reach, m.impressions,
+               m.engagement_rate, m.collected_at
+        FROM metrics m
+        JOIN posts p ON p.id = m.post_id
+        WHERE m.user_id = p_user_id
+          AND m.collected_at >= p_since
+          AND (p_platform IS NULL OR p.platform = p_platform)
+    ),
+    midpoint AS (
+        -- Growth compares the newer half of the window with the older half
+        SELECT percentile_disc(0.5) WITHIN GROUP (ORDER BY collected_at) AS mid
+        FROM scoped
+    ),
+    totals AS (
+        SELECT
+            COUNT(*) AS metric_rows,
+            COALESCE(SUM(s.likes), 0) AS total_likes,
+            COALESCE(SUM(s.comments), 0) AS total_comments,
+            COALESCE(SUM(s.shares), 0) AS total_shares,
+            COALESCE(SUM(s.reach), 0) AS total_reach,
+            COALESCE(SUM(s.impressions), 0) AS total_impressions,
+            ROUND(AVG(s.engagement_rate), 2) AS avg_engagement_rate,
+            AVG(s.engagement_rate) FILTER (WHERE s.collected_at >= mp.mid) AS recent_rate,
+            AVG(s.engagement_rate) FILTER (WHERE s.collected_at < mp.mid) AS older_rate
+        FROM scoped s CROSS JOIN midpoint mp
+    )
+    SELECT
+        (SELECT COUNT(*) FROM posts p
+         WHERE p.user_id = p_user_id
+           AND (p_platform IS NULL OR p.platform = p_platform)) AS post_count,
+        t.metric_rows,
+        t.total_likes,
+        t.total_comments,
+        t.total_shares,
+        t.total_reach,
+        t.total_impressions,
+        t.avg_engagement_rate,
+        CASE WHEN t.metric_rows >= 2 AND t.older_rate > 0
+             THEN ROUND((t.recent_rate - t.older_rate) / t.older_rate * 100, 2)
+        END AS growth_rate
+    FROM totals t;
+$$;
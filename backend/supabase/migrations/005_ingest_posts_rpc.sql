@@ -0,0 +1,82 @@
+-- Migration: Batched ingestion of synced posts and metrics
+-- ingest_posts() upserts a batch of normalized posts (keyed on
+-- UNIQUE(user_id, platform, platform_post_id)) and appends one metrics
+-- snapshot per post, in a single round-trip. It reports how many posts were
+-- inserted vs updated (xmax = 0 only for freshly inserted rows).
+-- Call through PostgREST: supabase.rpc("ingest_posts", {...})
+
+CREATE OR REPLACE FUNCTION ingest_posts(
+    p_user_id UUID,
+    p_platform TEXT,
+    p_rows JSONB
+)
+RETURNS TABLE (
+    inserted INTEGER,
+    updated INTEGER,
+    metrics_written INTEGER
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH incoming AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_rows) AS r(
+            platform_post_id TEXT,
+            content_type TEXT,
+            title TEXT,
+            description TEXT,
+            media_url TEXT,
+            permalink TEXT,
+            posted_at TIMESTAMP WITH TIME ZONE,
+            metadata JSONB,
+            likes INTEGER,
+            comments INTEGER,
+            shares INTEGER,
+            saves INTEGER,
+            reach INTEGER,
+            impressions INTEGER,
+            views INTEGER,
+            engagement_rate DECIMAL(5, 2)
+        )
+    ),
+    upserted AS (
+        INSERT INTO posts (
+            user_id, platform, platform_post_id, content_type, title,
+            description, media_url, permalink, posted_at, metadata
+        )
+        SELECT
+            p_user_id, p_platform, i.platform_post_id, i.content_type, i.title,
+            i.description, i.media_url, i.permalink, i.posted_at, COALESCE(i.metadata, '{}')
+        FROM incoming i
+        ON CONFLICT (user_id, platform, platform_post_id) DO UPDATE SET
+            content_type = EXCLUDED.content_type,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            media_url = EXCLUDED.media_url,
+            permalink = EXCLUDED.permalink,
+            posted_at = EXCLUDED.posted_at,
+            metadata = COALESCE(NULLIF(EXCLUDED.metadata, '{}'::jsonb), posts.metadata)
+        RETURNING posts.id, posts.platform_post_id, (xmax = 0) AS was_inserted
+    ),
+    written AS (
+        INSERT INTO metrics (
+            post_id, user_id, likes, comments, shares, saves,
+            reach, impressions, views, engagement_rate
+        )
+        SELECT
+            u.id, p_user_id,
+            COALESCE(i.likes, 0), COALESCE(i.comments, 0), COALESCE(i.shares, 0),
+            COALESCE(i.saves, 0), COALESCE(i.reach, 0), COALESCE(i.impressions, 0),
+            COALESCE(i.views, 0), COALESCE(i.engagement_rate, 0)
+        FROM upserted u
+        JOIN incoming i ON i.platform_post_id = u.platform_post_id
+        RETURNING 1
+    )
+    SELECT
+        (COUNT(*) FILTER (WHERE u.was_inserted))::INTEGER,
+        (COUNT(*) FILTER (WHERE NOT u.was_inserted))::INTEGER,
+        (SELECT COUNT(*) FROM written)::INTEGER
+    FROM upserted u;
+END;
+$$;
@@ -0,0 +1,202 @@
+-- Migration: Skip unchanged metric snapshots
+-- Most syncs find older posts with exactly the counters already recorded.
+-- posts.metrics_fingerprint keeps a compact digest of the last snapshot written
+-- for each post; ingest_posts() only appends a metrics row when it changed.
+-- posts.last_seen_at records when a sync last returned the post (the posts row
+-- is rewritten by the upsert anyway), so windowed reads can carry a post's
+-- latest snapshot forward instead of losing posts whose counters stood still.
+
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS metrics_fingerprint TEXT;
+ALTER TABLE posts ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP WITH TIME ZONE;
+
+UPDATE posts p
+SET last_seen_at = latest.collected_at
+FROM (
+    SELECT post_id, MAX(collected_at) AS collected_at
+    FROM metrics
+    GROUP BY post_id
+) latest
+WHERE latest.post_id = p.id
+  AND p.last_seen_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_posts_user_last_seen ON posts(user_id, last_seen_at DESC);
+
+-- Return type changes (metrics_skipped), so the function is recreated
+DROP FUNCTION IF EXISTS ingest_posts(UUID, TEXT, JSONB);
+
+CREATE OR REPLACE FUNCTION ingest_posts(
+    p_user_id UUID,
+    p_platform TEXT,
+    p_rows JSONB
+)
+RETURNS TABLE (
+    inserted INTEGER,
+    updated INTEGER,
+    metrics_written INTEGER,
+    metrics_skipped INTEGER
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH incoming AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_rows) AS r(
+            platform_post_id TEXT,
+            content_type TEXT,
+            title TEXT,
+            description TEXT,
+            media_url TEXT,
+            permalink TEXT,
+            posted_at TIMESTAMP WITH TIME ZONE,
+            metadata JSONB,
+            likes INTEGER,
+            comments INTEGER,
+            shares INTEGER,
+            saves INTEGER,
+            reach INTEGER,
+            impressions INTEGER,
+            views INTEGER,
+            engagement_rate DECIMAL(5, 2),
+            metrics_fingerprint TEXT
+        )
+    ),
+    previous AS (
+        -- Fingerprints as of before this statement (CTEs share one snapshot)
+        SELECT p.platform_post_id, p.metrics_fingerprint
+        FROM posts p
+        WHERE p.user_id = p_user_id
+          AND p.platform = p_platform
+          AND p.platform_post_id IN (SELECT platform_post_id FROM incoming)
+    ),
+    upserted AS (
+        INSERT INTO posts (
+            user_id, platform, platform_post_id, content_type, title,
+            description, media_url, permalink, posted_at, metadata, metrics_fingerprint,
+            last_seen_at
+        )
+        SELECT
+            p_user_id, p_platform, i.platform_post_id, i.content_type, i.title,
+            i.description, i.media_url, i.permalink, i.posted_at, COALESCE(i.metadata, '{}'),
+            i.metrics_fingerprint, NOW()
+        FROM incoming i
+        ON CONFLICT (user_id, platform, platform_post_id) DO UPDATE SET
+            content_type = EXCLUDED.content_type,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            media_url = EXCLUDED.media_url,
+            permalink = EXCLUDED.permalink,
+            posted_at = EXCLUDED.posted_at,
+            metadata = COALESCE(NULLIF(EXCLUDED.metadata, '{}'::jsonb), posts.metadata),
+            metrics_fingerprint = EXCLUDED.metrics_fingerprint,
+            last_seen_at = EXCLUDED.last_seen_at
+        RETURNING posts.id, posts.platform_post_id, (xmax = 0) AS was_inserted
+    ),
+    written AS (
+        INSERT INTO metrics (
+            post_id, user_id, likes, comments, shares, saves,
+            reach, impressions, views, engagement_rate
+        )
+        SELECT
+            u.id, p_user_id,
+            COALESCE(i.likes, 0), COALESCE(i.comments, 0), COALESCE(i.shares, 0),
+            COALESCE(i.saves, 0), COALESCE(i.reach, 0), COALESCE(i.impressions, 0),
+            COALESCE(i.views, 0), COALESCE(i.engagement_rate, 0)
+        FROM upserted u
+        JOIN incoming i ON i.platform_post_id = u.platform_post_id
+        LEFT JOIN previous pr ON pr.platform_post_id = u.platform_post_id
+        -- Skip the snapshot when no counter moved since the last one written
+        WHERE i.metrics_fingerprint IS NULL
+           OR pr.metrics_fingerprint IS DISTINCT FROM i.metrics_fingerprint
+        RETURNING 1
+    )
+    SELECT
+        (COUNT(*) FILTER (WHERE u.was_inserted))::INTEGER,
+        (COUNT(*) FILTER (WHERE NOT u.was_inserted))::INTEGER,
+        (SELECT COUNT(*) FROM written)::INTEGER,
+        (COUNT(*) - (SELECT COUNT(*) FROM written))::INTEGER
+    FROM upserted u;
+END;
+$$;
+
+-- Windowed reads: a post synced in the window whose counters have not moved
+-- has no snapshot in it, so its latest snapshot is carried forward
+CREATE OR REPLACE FUNCTION analytics_summary(
+    p_user_id UUID,
+    p_since TIMESTAMP WITH TIME ZONE,
+    p_platform TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+    post_count BIGINT,
+    metric_rows BIGINT,
+    total_likes BIGINT,
+    total_comments BIGINT,
+    total_shares BIGINT,
+    total_reach BIGINT,
+    total_impressions BIGINT,
+    avg_engagement_rate NUMERIC,
+    growth_rate NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH scoped AS (
+        SELECT m.likes, m.comments, m.shares, m.reach, m.impressions,
+               m.engagement_rate, m.collected_at
+        FROM metrics m
+        JOIN posts p ON p.id = m.post_id
+        WHERE m.user_id = p_user_id
+          AND m.collected_at >= p_since
+          AND (p_platform IS NULL OR p.platform = p_platform)
+        UNION ALL
+        (
+            SELECT DISTINCT ON (m.post_id)
+                   m.likes, m.comments, m.shares, m.reach, m.impressions,
+                   m.engagement_rate, m.collected_at
+            FROM metrics m
+            JOIN posts p ON p.id = m.post_id
+            WHERE p.user_id = p_user_id
+              AND p.last_seen_at >= p_since
+              AND (p_platform IS NULL OR p.platform = p_platform)
+              AND m.collected_at < p_since
+              AND NOT EXISTS (
+                  SELECT 1 FROM metrics w
+                  WHERE w.post_id = m.post_id AND w.collected_at >= p_since
+              )
+            ORDER BY m.post_id, m.collected_at DESC
+        )
+    ),
+    midpoint AS (
+        -- Growth compares the newer half of the window with the older half
+        SELECT percentile_disc(0.5) WITHIN GROUP (ORDER BY collected_at) AS mid
+        FROM scoped
+    ),
+    totals AS (
+        SELECT
+            COUNT(*) AS metric_rows,
+            COALESCE(SUM(s.likes), 0) AS total_likes,
+            COALESCE(SUM(s.comments), 0) AS total_comments,
+            COALESCE(SUM(s.shares), 0) AS total_shares,
+            COALESCE(SUM(s.reach), 0) AS total_reach,
+            COALESCE(SUM(s.impressions), 0) AS total_impressions,
+            ROUND(AVG(s.engagement_rate), 2) AS avg_engagement_rate,
+            AVG(s.engagement_rate) FILTER (WHERE s.collected_at >= mp.mid) AS recent_rate,
+            AVG(s.engagement_rate) FILTER (WHERE s.collected_at < mp.mid) AS older_rate
+        FROM scoped s CROSS JOIN midpoint mp
+    )
+    SELECT
+        (SELECT COUNT(*) FROM posts p
+         WHERE p.user_id = p_user_id
+           AND (p_platform IS NULL OR p.platform = p_platform)) AS post_count,
+        t.metric_rows,
+        t.total_likes,
+        t.total_comments,
+        t.total_shares,
+        t.total_reach,
+        t.total_impressions,
+        t.avg_engagement_rate,
+        CASE WHEN t.metric_rows >= 2 AND t.older_rate > 0
+             THEN ROUND((t.recent_rate - t.older_rate) / t.older_rate * 100, 2)
+        END AS growth_rate
+    FROM totals t;
+$$;
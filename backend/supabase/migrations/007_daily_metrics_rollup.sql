@@ -0,0 +1,227 @@
+-- Migration: Daily metrics rollups
+-- Analytics reads used to re-aggregate raw metrics rows on every request.
+-- These rollups hold the same sums per (user, platform, content type, day)
+-- and per posting hour/weekday; ingest_posts() adds every snapshot it writes,
+-- so a 90-day overview reads at most ~90 rows per platform/content type.
+-- engagement_rate_sum / metric_rows gives the average engagement rate.
+
+-- =====================================================
+-- DAILY METRICS ROLLUP (by collection day, UTC)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS daily_metrics_rollup (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    platform TEXT NOT NULL,
+    content_type TEXT NOT NULL, -- 'unknown' when the post has none
+    day DATE NOT NULL,
+    metric_rows INTEGER NOT NULL DEFAULT 0,
+    likes BIGINT NOT NULL DEFAULT 0,
+    comments BIGINT NOT NULL DEFAULT 0,
+    shares BIGINT NOT NULL DEFAULT 0,
+    saves BIGINT NOT NULL DEFAULT 0,
+    reach BIGINT NOT NULL DEFAULT 0,
+    impressions BIGINT NOT NULL DEFAULT 0,
+    views BIGINT NOT NULL DEFAULT 0,
+    engagement_rate_sum NUMERIC NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (user_id, platform, content_type, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_daily_rollup_user_day ON daily_metrics_rollup(user_id, day DESC);
+
+-- =====================================================
+-- POSTING HOUR ROLLUP (by when the post went out, UTC)
+-- posted_dow: 0 = Monday ... 6 = Sunday
+-- =====================================================
+CREATE TABLE IF NOT EXISTS posting_hour_rollup (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    platform TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    posted_dow SMALLINT NOT NULL CHECK (posted_dow BETWEEN 0 AND 6),
+    posted_hour SMALLINT NOT NULL CHECK (posted_hour BETWEEN 0 AND 23),
+    metric_rows INTEGER NOT NULL DEFAULT 0,
+    engagement_rate_sum NUMERIC NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (user_id, platform, content_type, posted_dow, posted_hour)
+);
+
+-- Users read their own rollups; only ingestion (service role) writes them
+ALTER TABLE daily_metrics_rollup ENABLE ROW LEVEL SECURITY;
+ALTER TABLE posting_hour_rollup ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own daily rollups" ON daily_metrics_rollup
+    FOR SELECT USING (auth.uid() = user_id);
+CREATE POLICY "Users can view their own posting hour rollups" ON posting_hour_rollup
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- Backfill from the metrics already collected
+INSERT INTO daily_metrics_rollup (
+    user_id, platform, content_type, day, metric_rows, likes, comments,
+    shares, saves, reach, impressions, views, engagement_rate_sum
+)
+SELECT
+    m.user_id, p.platform, COALESCE(p.content_type, 'unknown'), (m.collected_at AT TIME ZONE 'UTC')::DATE,
+    COUNT(*), SUM(COALESCE(m.likes, 0)), SUM(COALESCE(m.comments, 0)), SUM(COALESCE(m.shares, 0)),
+    SUM(COALESCE(m.saves, 0)), SUM(COALESCE(m.reach, 0)), SUM(COALESCE(m.impressions, 0)),
+    SUM(COALESCE(m.views, 0)), SUM(COALESCE(m.engagement_rate, 0))
+FROM metrics m
+JOIN posts p ON p.id = m.post_id
+GROUP BY 1, 2, 3, 4
+ON CONFLICT DO NOTHING;
+
+INSERT INTO posting_hour_rollup (
+    user_id, platform, content_type, posted_dow, posted_hour,
+    metric_rows, engagement_rate_sum
+)
+SELECT
+    m.user_id, p.platform, COALESCE(p.content_type, 'unknown'),
+    (EXTRACT(ISODOW FROM p.posted_at AT TIME ZONE 'UTC') - 1)::SMALLINT,
+    EXTRACT(HOUR FROM p.posted_at AT TIME ZONE 'UTC')::SMALLINT,
+    COUNT(*), SUM(COALESCE(m.engagement_rate, 0))
+FROM metrics m
+JOIN posts p ON p.id = m.post_id
+WHERE p.posted_at IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5
+ON CONFLICT DO NOTHING;
+
+-- Keep the rollups current from ingestion
+CREATE OR REPLACE FUNCTION ingest_posts(
+    p_user_id UUID,
+    p_platform TEXT,
+    p_rows JSONB
+)
+RETURNS TABLE (
+    inserted INTEGER,
+    updated INTEGER,
+    metrics_written INTEGER,
+    metrics_skipped INTEGER
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH incoming AS (
+        SELECT *
+        FROM jsonb_to_recordset(p_rows) AS r(
+            platform_post_id TEXT,
+            content_type TEXT,
+            title TEXT,
+            description TEXT,
+            media_url TEXT,
+            permalink TEXT,
+            posted_at TIMESTAMP WITH TIME ZONE,
+            metadata JSONB,
+            likes INTEGER,
+            comments INTEGER,
+            shares INTEGER,
+            saves INTEGER,
+            reach INTEGER,
+            impressions INTEGER,
+            views INTEGER,
+            engagement_rate DECIMAL(5, 2),
+            metrics_fingerprint TEXT
+        )
+    ),
+    previous AS (
+        -- Fingerprints as of before this statement (CTEs share one snapshot)
+        SELECT p.platform_post_id, p.metrics_fingerprint
+        FROM posts p
+        WHERE p.user_id = p_user_id
+          AND p.platform = p_platform
+          AND p.platform_post_id IN (SELECT platform_post_id FROM incoming)
+    ),
+    upserted AS (
+        INSERT INTO posts (
+            user_id, platform, platform_post_id, content_type, title,
+            description, media_url, permalink, posted_at, metadata, metrics_fingerprint,
+            last_seen_at
+        )
+        SELECT
+            p_user_id, p_platform, i.platform_post_id, i.content_type, i.title,
+            i.description, i.media_url, i.permalink, i.posted_at, COALESCE(i.metadata, '{}'),
+            i.metrics_fingerprint, NOW()
+        FROM incoming i
+        ON CONFLICT (user_id, platform, platform_post_id) DO UPDATE SET
+            content_type = EXCLUDED.content_type,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            media_url = EXCLUDED.media_url,
+            permalink = EXCLUDED.permalink,
+            posted_at = EXCLUDED.posted_at,
+            metadata = COALESCE(NULLIF(EXCLUDED.metadata, '{}'::jsonb), posts.metadata),
+            metrics_fingerprint = EXCLUDED.metrics_fingerprint,
+            last_seen_at = EXCLUDED.last_seen_at
+        RETURNING posts.id, posts.platform_post_id, (xmax = 0) AS was_inserted
+    ),
+    written AS (
+        INSERT INTO metrics (
+            post_id, user_id, likes, comments, shares, saves,
+            reach, impressions, views, engagement_rate
+        )
+        SELECT
+            u.id, p_user_id,
+            COALESCE(i.likes, 0), COALESCE(i.comments, 0), COALESCE(i.shares, 0),
+            COALESCE(i.saves, 0), COALESCE(i.reach, 0), COALESCE(i.impressions, 0),
+            COALESCE(i.views, 0), COALESCE(i.engagement_rate, 0)
+        FROM upserted u
+        JOIN incoming i ON i.platform_post_id = u.platform_post_id
+        LEFT JOIN previous pr ON pr.platform_post_id = u.platform_post_id
+        -- Skip the snapshot when no counter moved since the last one written
+        WHERE i.metrics_fingerprint IS NULL
+           OR pr.metrics_fingerprint IS DISTINCT FROM i.metrics_fingerprint
+        RETURNING metrics.post_id, metrics.likes, metrics.comments, metrics.shares,
+                  metrics.saves, metrics.reach, metrics.impressions, metrics.views,
+                  metrics.engagement_rate, metrics.collected_at
+    ),
+    snapshots AS (
+        SELECT w.*, COALESCE(i.content_type, 'unknown') AS content_type, i.posted_at
+        FROM written w
+        JOIN upserted u ON u.id = w.post_id
+        JOIN incoming i ON i.platform_post_id = u.platform_post_id
+    ),
+    daily AS (
+        INSERT INTO daily_metrics_rollup AS r (
+            user_id, platform, content_type, day, metric_rows, likes, comments,
+            shares, saves, reach, impressions, views, engagement_rate_sum
+        )
+        SELECT
+            p_user_id, p_platform, s.content_type, (s.collected_at AT TIME ZONE 'UTC')::DATE,
+            COUNT(*), SUM(s.likes), SUM(s.comments), SUM(s.shares), SUM(s.saves),
+            SUM(s.reach), SUM(s.impressions), SUM(s.views), SUM(s.engagement_rate)
+        FROM snapshots s
+        GROUP BY s.content_type, (s.collected_at AT TIME ZONE 'UTC')::DATE
+        ON CONFLICT (user_id, platform, content_type, day) DO UPDATE SET
+            metric_rows = r.metric_rows + EXCLUDED.metric_rows,
+            likes = r.likes + EXCLUDED.likes,
+            comments = r.comments + EXCLUDED.comments,
+            shares = r.shares + EXCLUDED.shares,
+            saves = r.saves + EXCLUDED.saves,
+            reach = r.reach + EXCLUDED.reach,
+            impressions = r.impressions + EXCLUDED.impressions,
+            views = r.views + EXCLUDED.views,
+            engagement_rate_sum = r.engagement_rate_sum + EXCLUDED.engagement_rate_sum
+    ),
+    hourly AS (
+        INSERT INTO posting_hour_rollup AS r (
+            user_id, platform, content_type, posted_dow, posted_hour,
+            metric_rows, engagement_rate_sum
+        )
+        SELECT
+            p_user_id, p_platform, s.content_type,
+            (EXTRACT(ISODOW FROM s.posted_at AT TIME ZONE 'UTC') - 1)::SMALLINT,
+            EXTRACT(HOUR FROM s.posted_at AT TIME ZONE 'UTC')::SMALLINT,
+            COUNT(*), SUM(s.engagement_rate)
+        FROM snapshots s
+        WHERE s.posted_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT (user_id, platform, content_type, posted_dow, posted_hour) DO UPDATE SET
+            metric_rows = r.metric_rows + EXCLUDED.metric_rows,
+            engagement_rate_sum = r.engagement_rate_sum + EXCLUDED.engagement_rate_sum
+    )
+    SELECT
+        (COUNT(*) FILTER (WHERE u.was_inserted))::INTEGER,
+        (COUNT(*) FILTER (WHERE NOT u.was_inserted))::INTEGER,
+        (SELECT COUNT(*) FROM written)::INTEGER,
+        (COUNT(*) - (SELECT COUNT(*) FROM written))::INTEGER
+    FROM upserted u;
+END;
+$$;